@@ -1,9 +1,12 @@
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
-from app.database import get_db
+import time
+from app.cache import TTLCache
+from app.database import get_async_db
 from app.models import User
 
 security = HTTPBearer()
@@ -11,39 +14,104 @@ security = HTTPBearer()
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "300"))
+# The user cache is per worker: invalidate_user only clears the worker that
+# made the change, so other workers and replicas may serve the old snapshot
+# (e.g. email_opt_in on /users/profile) for up to this long. Kept short and
+# capped; the newsletter reads users from the database, not from here.
+AUTH_USER_CACHE_MAX_TTL = 30.0
+AUTH_USER_CACHE_TTL = min(
+    float(os.getenv("AUTH_USER_CACHE_TTL", "10")), AUTH_USER_CACHE_MAX_TTL
+)
+
+# token -> decoded payload, user id -> CurrentUser
+token_cache = TTLCache("auth_tokens", maxsize=AUTH_CACHE_SIZE, ttl=AUTH_TOKEN_CACHE_TTL)
+user_cache = TTLCache("auth_users", maxsize=AUTH_CACHE_SIZE, ttl=AUTH_USER_CACHE_TTL)
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """인증된 사용자 정보 (세션에 묶이지 않은 캐시용 스냅샷)"""
+
+    id: str
+    email: str
+    name: str
+    provider: str
+    email_opt_in: bool
+
+    @classmethod
+    def from_model(cls, user: User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            provider=user.provider,
+            email_opt_in=bool(user.email_opt_in),
+        )
+
+
+def invalidate_user(user_id: str):
+    """
+    사용자 정보가 변경되었을 때 이 워커의 캐시에서 제거.
+    다른 워커/레플리카는 최대 AUTH_USER_CACHE_TTL초 동안 이전 정보를 반환할 수 있음.
+    """
+    user_cache.invalidate(user_id)
+
+
+def _unauthorized():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="토큰이 유효하지 않습니다.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """JWT 토큰을 검증하고 사용자 정보를 반환"""
     token = credentials.credentials
-    
+
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("id")
-        email: str = payload.get("sub")
-        
-        if user_id is None or email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="토큰이 유효하지 않습니다.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        return {"id": user_id, "email": email, "payload": payload}
-        
     except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="토큰이 유효하지 않습니다.",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized()
+
+    user_id: str = payload.get("id")
+    email: str = payload.get("sub")
+
+    if user_id is None or email is None:
+        raise _unauthorized()
+
+    token_data = {"id": user_id, "email": email, "payload": payload}
+
+    # Never cache a token past its own expiry
+    ttl = AUTH_TOKEN_CACHE_TTL
+    if isinstance(payload.get("exp"), (int, float)):
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(token, token_data, ttl=ttl)
+
+    return token_data
+
+
+async def get_current_user(db: AsyncSession = Depends(get_async_db), token_data: dict = Depends(verify_token)):
+    """현재 사용자 정보를 가져옴 (캐시 미스일 때만 데이터베이스 조회)"""
+    current_user = user_cache.get(token_data["id"])
+    if current_user is not None:
+        return current_user
+
+    user = await db.get(User, token_data["id"])
 
-async def get_current_user(db: Session = Depends(get_db), token_data: dict = Depends(verify_token)):
-    """현재 사용자 정보를 데이터베이스에서 가져옴"""
-    user = db.query(User).filter(User.id == token_data["id"]).first()
-    
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="사용자를 찾을 수 없습니다."
         )
-    
-    return user
+
+    current_user = CurrentUser.from_model(user)
+    user_cache.set(user.id, current_user)
+    return current_user
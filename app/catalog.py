@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi_utilities import repeat_every
+
+from app.database import SessionLocal
+from app.http_cache import etag_matches, make_etag
+from app.models import StockBATMMAAN, StockIndex
+
+CATALOG_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+# Each worker re-reads the catalog this often, so a seed change reaches
+# every worker without a broadcast
+CATALOG_REFRESH_SECONDS = int(os.getenv("CATALOG_REFRESH_SECONDS", "300"))
+
+logger = logging.getLogger(__name__)
+
+
+def _dumps(data) -> bytes:
+    # Same encoding as FastAPI's JSONResponse
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class TickerCatalog:
+    """
+    Process-wide cache of the near-static stock_index / stock_batmmaan seed
+    tables, held as pre-serialized JSON bodies with content-hash ETags.
+
+    Each worker holds its own copy: it is loaded in the lifespan and
+    re-read every CATALOG_REFRESH_SECONDS (process_catalog_refresh).
+    POST /internal/catalog/refresh only reloads the worker that serves it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._payloads: Optional[Dict[str, Tuple[bytes, str]]] = None
+        self.version: Optional[str] = None
+
+    def refresh(self) -> str:
+        """DB에서 카탈로그를 다시 읽어 응답 본문을 교체하고 새 버전을 반환"""
+        with SessionLocal() as db:
+            indices = db.query(StockIndex).order_by(StockIndex.Ticker).all()
+            stocks = db.query(StockBATMMAAN).order_by(StockBATMMAAN.Ticker).all()
+
+        bodies = {
+            "index-names": _dumps([{"ticker": i.Ticker, "name": i.Name} for i in indices]),
+            "batmmaan-names": _dumps([{"ticker": s.Ticker, "name": s.Name} for s in stocks]),
+            "tickers:index": _dumps(
+                [{"Ticker": i.Ticker, "Name": i.Name, "query": i.query} for i in indices]
+            ),
+            "tickers:stock": _dumps(
+                [{"Ticker": s.Ticker, "Name": s.Name, "query": s.query} for s in stocks]
+            ),
+        }
+        payloads = {name: (body, make_etag(body)) for name, body in bodies.items()}
+        version = hashlib.sha256(
+            "".join(etag for _, etag in payloads.values()).encode()
+        ).hexdigest()[:16]
+
+        with self._lock:
+            self._payloads = payloads
+            previous, self.version = self.version, version
+        if version != previous:
+            logger.info(f"Ticker catalog loaded (version {version})")
+        return version
+
+    async def get(self, name: str) -> Tuple[bytes, str]:
+        payloads = self._payloads
+        if payloads is None:
+            # not warmed by the lifespan: load off the event loop
+            await asyncio.to_thread(self.refresh)
+            payloads = self._payloads
+        return payloads[name]
+
+    async def response(self, name: str, request: Request) -> Response:
+        body, etag = await self.get(name)
+        headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+catalog = TickerCatalog()
+
+
+@repeat_every(seconds=CATALOG_REFRESH_SECONDS, wait_first=True, logger=logger)
+async def process_catalog_refresh():
+    """이 워커의 카탈로그 캐시를 주기적으로 DB와 맞춥니다."""
+    await asyncio.to_thread(catalog.refresh)
@@ -1,47 +1,43 @@
-from app.database import Base, engine, SessionLocal
-from app.models import (
-    StockIndex,
-    StockBATMMAAN,
-)
-import json
-import os
-
-Base.metadata.create_all(bind=engine)
+from alembic import command
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+
+from app.database import Base, engine
+from app.seed import seed_catalog
+from app.startup import alembic_config
+import app.news_dates  # noqa: F401  (installs news_dates triggers on create_all)
+import logging
+
+
+def create_tables():
+    """
+    Creates the schema on an empty database and stamps it at the alembic
+    head, so later upgrades start from there. create_all only adds missing
+    tables, never columns, so an existing database must be migrated instead.
+    """
+    config = alembic_config()
+    head = ScriptDirectory.from_config(config).get_current_head()
+    with engine.connect() as conn:
+        revision = MigrationContext.configure(conn).get_current_revision()
+        tables = inspect(conn).get_table_names()
+    if revision == head:
+        return
+    if tables:
+        raise RuntimeError(
+            f"create_all only initializes an empty database; this one is at "
+            f"revision {revision or 'none (unversioned)'}. "
+            f"Run `alembic upgrade head` (STARTUP_DDL=migrate) instead"
+        )
+    Base.metadata.create_all(bind=engine)
+    command.stamp(config, "head")
 
 
 def load_initial_data():
-    db = SessionLocal()
-
-    index_path = os.path.join("app", "data", "stock_index.json")
-    if os.path.exists(index_path):
-        with open(index_path, "r", encoding="utf-8") as f:
-            index_data = json.load(f)
-            for item in index_data:
-                if not db.query(StockIndex).filter_by(Ticker=item["Ticker"]).first():
-                    db.add(
-                        StockIndex(
-                            Ticker=item["Ticker"],
-                            Name=item["Name"],
-                            query=item.get("query", ""),
-                        )
-                    )
-
-    batmmaan_path = os.path.join("app", "data", "stock_BATMMAAN.json")
-    if os.path.exists(batmmaan_path):
-        with open(batmmaan_path, "r", encoding="utf-8") as f:
-            stock_data = json.load(f)
-            for item in stock_data:
-                if not db.query(StockBATMMAAN).filter_by(Ticker=item["Ticker"]).first():
-                    db.add(
-                        StockBATMMAAN(
-                            Ticker=item["Ticker"],
-                            Name=item["Name"],
-                            query=item.get("query", ""),
-                        )
-                    )
-
-    db.commit()
-    db.close()
+    seed_catalog(engine)
 
 
-load_initial_data()
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    create_tables()
+    load_initial_data()
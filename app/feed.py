@@ -0,0 +1,323 @@
+"""
+Materialized per-user feed for GET /users/feed.
+
+A feed is the newsletter ranking (app.llm.select_summaries_for_tickers)
+stored as ordered user_feed_items rows, so reading a page is one primary-key
+lookup of user_feeds plus a range scan on (user_id, position); nothing is
+ranked at read time. Feeds are recomputed:
+
+- for the users of tickers whose news_dates rollup changed after their
+  feed's watermark (`refresh_stale_feeds`, every FEED_REFRESH_SECONDS). The
+  rollup is trigger-maintained, so analyses written by the crawler count
+  too. A sweep loads the candidates of the affected tickers once and only
+  rewrites feeds whose items changed.
+- for users whose interests changed: PUT /users/interests marks the feed
+  stale and rebuilds it in a background task (`refresh_user_feed_task`)
+- on the first read by a user who has no feed yet (sweeps only revisit
+  existing feeds)
+"""
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from fastapi_utilities import repeat_every
+from sqlalchemy import delete, func, insert, null, select, union, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal, dialect_insert
+from app.jobs import JobRunLease
+from app.llm import (
+    get_ticker_candidates,
+    get_user_tickers,
+    select_summaries_for_tickers,
+)
+from app.models import (
+    LLMNews,
+    NewsArticle,
+    NewsDate,
+    UserFeed,
+    UserFeedItem,
+    user_index_interest,
+    user_stock_interest,
+)
+from app.sql_profiler import profiled_job
+
+FEED_SIZE = int(os.getenv("FEED_SIZE", "100"))
+FEED_ARTICLES_PER_TICKER = int(os.getenv("FEED_ARTICLES_PER_TICKER", "30"))
+FEED_REFRESH_SECONDS = int(os.getenv("FEED_REFRESH_SECONDS", "60"))
+FEED_REFRESH_CHUNK_SIZE = int(os.getenv("FEED_REFRESH_CHUNK_SIZE", "500"))
+# Longest expected writer transaction (crawler batch) on news_articles / llm_news
+FEED_WATERMARK_OVERLAP_SECONDS = int(os.getenv("FEED_WATERMARK_OVERLAP_SECONDS", "120"))
+
+INTEREST_TABLES = (user_index_interest, user_stock_interest)
+
+logger = logging.getLogger(__name__)
+
+
+async def get_feed_candidates(db: AsyncSession, tickers: Iterable[str]):
+    return await get_ticker_candidates(db, tickers, per_ticker=FEED_ARTICLES_PER_TICKER)
+
+
+async def read_watermark(db: AsyncSession) -> datetime:
+    """
+    DB time minus FEED_WATERMARK_OVERLAP_SECONDS, read before any candidate.
+    A writer stamps news_dates.updated_at when its transaction starts, so a
+    change stamped before the refresh may commit after it; such changes are
+    still newer than the watermark and the next sweep picks them up.
+    """
+    now = (await db.execute(select(func.now()))).scalar()
+    return now - timedelta(seconds=FEED_WATERMARK_OVERLAP_SECONDS)
+
+
+async def refresh_feeds(
+    db: AsyncSession,
+    user_ids: Iterable[str],
+    candidates: Optional[Dict[str, List[Dict]]] = None,
+    watermark: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """
+    Recomputes the feeds of `user_ids` from the per-ticker `candidates`
+    (loaded for their tickers when not given, after reading the watermark).
+    Only feeds whose items changed are rewritten; the others just advance
+    their watermark. Returns {user_id: item count} of the rewritten feeds.
+    The caller commits.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+
+    if watermark is None:
+        watermark = await read_watermark(db)
+    interests = await get_user_tickers(db, user_ids)
+    if candidates is None:
+        candidates = await get_feed_candidates(db, set().union(*interests.values()))
+
+    current: Dict[str, List[str]] = {}
+    rows = await db.execute(
+        select(UserFeed.user_id, UserFeedItem.news_id)
+        .outerjoin(UserFeedItem, UserFeedItem.user_id == UserFeed.user_id)
+        .where(UserFeed.user_id.in_(user_ids))
+        .order_by(UserFeed.user_id, UserFeedItem.position)
+    )
+    for row in rows:
+        items = current.setdefault(row.user_id, [])
+        if row.news_id is not None:
+            items.append(row.news_id)
+
+    changed: Dict[str, List[str]] = {}
+    for user_id, tickers in list(interests.items()):
+        if not tickers <= candidates.keys():
+            # interests changed after the sweep loaded candidates: stay stale
+            del interests[user_id]
+            continue
+        picks = select_summaries_for_tickers(
+            tickers, candidates, max_count=FEED_SIZE, strict=False
+        )
+        news_ids = [item["id"] for item in picks]
+        if current.get(user_id) != news_ids:
+            changed[user_id] = news_ids
+
+    unchanged = [user_id for user_id in interests if user_id not in changed]
+    if unchanged:
+        await db.execute(
+            update(UserFeed)
+            .where(UserFeed.user_id.in_(unchanged))
+            .values(watermark=watermark)
+        )
+    if not changed:
+        return {}
+
+    await db.execute(delete(UserFeedItem).where(UserFeedItem.user_id.in_(changed)))
+    items = [
+        {"user_id": user_id, "position": position, "news_id": news_id}
+        for user_id, news_ids in changed.items()
+        for position, news_id in enumerate(news_ids, 1)
+    ]
+    if items:
+        await db.execute(insert(UserFeedItem), items)
+
+    stmt = dialect_insert(db.bind, UserFeed).values(
+        [
+            {
+                "user_id": user_id,
+                "item_count": len(news_ids),
+                "refreshed_at": func.now(),
+                "watermark": watermark,
+            }
+            for user_id, news_ids in changed.items()
+        ]
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "item_count": stmt.excluded.item_count,
+                "refreshed_at": stmt.excluded.refreshed_at,
+                "watermark": stmt.excluded.watermark,
+            },
+        )
+    )
+    return {user_id: len(news_ids) for user_id, news_ids in changed.items()}
+
+
+async def refresh_user_feed(db: AsyncSession, user_id: str) -> Optional[UserFeed]:
+    """
+    Rebuilds and commits one user's feed, e.g. on their first feed read.
+    Returns the new feed state, or None if a concurrent refresh won the race
+    (its feed is just as fresh).
+    """
+    try:
+        await refresh_feeds(db, [user_id])
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        logger.info(f"Feed for {user_id} was refreshed concurrently")
+        return None
+    return await db.get(UserFeed, user_id, populate_existing=True)
+
+
+async def refresh_user_feed_task(user_id: str) -> None:
+    """refresh_user_feed in its own session, for use as a BackgroundTask"""
+    async with AsyncSessionLocal() as db:
+        await refresh_user_feed(db, user_id)
+
+
+async def mark_feed_stale(db: AsyncSession, user_id: str) -> None:
+    """
+    Marks a user's feed for rebuild in the caller's transaction. Until it is
+    rebuilt, reads keep serving the previous feed; if the background rebuild
+    fails, the next sweep picks the feed up.
+    """
+    await db.execute(
+        update(UserFeed).where(UserFeed.user_id == user_id).values(watermark=None)
+    )
+
+
+def stale_feeds_query(include_missing: bool = False):
+    """
+    Users whose feed is marked for rebuild (watermark NULL) or older than a
+    news_dates change of one of their tickers. Only news_dates rows newer
+    than the oldest watermark are read (ix_news_dates_updated_at) and only
+    the users of those tickers are visited, so a quiet sweep costs index
+    probes, not a pass over every user's history. With `include_missing`,
+    users that have interests but no feed yet are added too; that scans the
+    interests, so only bulk builds ask for it (feeds are built on first read).
+    """
+    oldest = select(func.min(UserFeed.watermark)).scalar_subquery()
+    changed = (
+        select(NewsDate.ticker, NewsDate.updated_at)
+        .where(NewsDate.updated_at > oldest)
+        .cte("changed")
+    )
+    queries = [select(UserFeed.user_id).where(UserFeed.watermark.is_(None))]
+    for table in INTEREST_TABLES:
+        queries.append(
+            select(table.c.user_id)
+            .join(changed, changed.c.ticker == table.c.ticker)
+            .join(UserFeed, UserFeed.user_id == table.c.user_id)
+            .where(changed.c.updated_at > UserFeed.watermark)
+        )
+        if include_missing:
+            queries.append(
+                select(table.c.user_id)
+                .outerjoin(UserFeed, UserFeed.user_id == table.c.user_id)
+                .where(UserFeed.user_id.is_(None))
+            )
+    return union(*queries)
+
+
+def stale_interests_query(include_missing: bool = False):
+    """
+    (user_id, ticker) of every stale user, plus a (user_id, NULL) row so
+    users without interests are listed. One statement, so the tickers cover
+    exactly the users found.
+    """
+    stale = stale_feeds_query(include_missing).cte("stale")
+    return union(
+        select(stale.c.user_id, null().label("ticker")),
+        *(
+            select(stale.c.user_id, table.c.ticker).join(
+                table, table.c.user_id == stale.c.user_id
+            )
+            for table in INTEREST_TABLES
+        ),
+    )
+
+
+async def refresh_stale_feeds(
+    chunk_size: int = FEED_REFRESH_CHUNK_SIZE, include_missing: bool = False
+) -> int:
+    """
+    Recomputes every stale feed (and with `include_missing`, builds the
+    feeds users do not have yet), committing per chunk. The candidates of
+    the stale users' tickers are loaded once per sweep. Returns the number
+    of feeds whose items changed.
+    """
+    async with AsyncSessionLocal() as db:
+        watermark = await read_watermark(db)
+        rows = (await db.execute(stale_interests_query(include_missing))).all()
+        if not rows:
+            return 0
+        user_ids = sorted({row.user_id for row in rows})
+        tickers = {row.ticker for row in rows if row.ticker is not None}
+        candidates = await get_feed_candidates(db, tickers)
+
+    refreshed = 0
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        async with AsyncSessionLocal() as db:
+            try:
+                changed = await refresh_feeds(db, chunk, candidates, watermark)
+                await db.commit()
+                refreshed += len(changed)
+            except IntegrityError:
+                # raced a per-user refresh; the next sweep picks up what is left
+                await db.rollback()
+                logger.warning(f"Feed refresh raced a concurrent refresh ({len(chunk)} users)")
+    return refreshed
+
+
+@repeat_every(seconds=FEED_REFRESH_SECONDS, logger=logger)
+@profiled_job("feed_refresh")
+async def process_feeds():
+    """news_dates가 바뀐 티커의 사용자 피드를 주기적으로 갱신합니다."""
+    # A recurring lease: released after each sweep, so one node sweeps at a time
+    lease = JobRunLease("feed_refresh", "sweep")
+    if not await lease.acquire():
+        return
+    try:
+        refreshed = await refresh_stale_feeds()
+        if refreshed:
+            logger.info(f"Feeds rewritten: {refreshed} users")
+    finally:
+        await lease.finish("running")
+
+
+def feed_page_query(user_id: str, after: Optional[int], limit: int):
+    """One page of a user's feed, in rank order, starting after position `after`"""
+    query = (
+        select(
+            UserFeedItem.position,
+            NewsArticle.id,
+            NewsArticle.ticker,
+            NewsArticle.date,
+            NewsArticle.title,
+            NewsArticle.real_url,
+            LLMNews.summary,
+            LLMNews.subject,
+            LLMNews.valence,
+            LLMNews.arousal,
+            LLMNews.importance,
+        )
+        .join(NewsArticle, NewsArticle.id == UserFeedItem.news_id)
+        .join(LLMNews, LLMNews.id == UserFeedItem.news_id)
+        .where(UserFeedItem.user_id == user_id)
+        .order_by(UserFeedItem.position)
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(UserFeedItem.position > after)
+    return query
+
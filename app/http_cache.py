@@ -0,0 +1,86 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def make_etag(content: bytes) -> str:
+    """응답 본문 기반 strong ETag"""
+    return '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 헤더가 etag와 일치하는지 확인"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive timestamps (e.g. SQLite CURRENT_TIMESTAMP) are stored in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def not_modified_since(request: Request, last_modified: Optional[datetime]) -> bool:
+    """If-Modified-Since 이후 변경이 없는지 확인"""
+    header = request.headers.get("if-modified-since")
+    if not header or last_modified is None:
+        return False
+    try:
+        since = _as_utc(parsedate_to_datetime(header))
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one-second resolution
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+class ConditionalResponse:
+    """
+    Validators and caching policy for one response. `not_modified()` answers
+    If-None-Match (or, when absent, If-Modified-Since) and `apply()` writes
+    ETag / Last-Modified / Cache-Control on the outgoing response.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        etag: str,
+        last_modified: Optional[datetime] = None,
+        cache_control: Optional[str] = None,
+    ):
+        self.request = request
+        self.etag = etag
+        self.last_modified = last_modified
+        self.cache_control = cache_control
+
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                _as_utc(self.last_modified), usegmt=True
+            )
+        if self.cache_control:
+            headers["Cache-Control"] = self.cache_control
+        return headers
+
+    def not_modified(self) -> Optional[Response]:
+        if "if-none-match" in self.request.headers:
+            matched = etag_matches(self.request, self.etag)
+        else:
+            matched = not_modified_since(self.request, self.last_modified)
+        if matched:
+            return Response(status_code=304, headers=self.headers())
+        return None
+
+    def apply(self, response: Response):
+        response.headers.update(self.headers())
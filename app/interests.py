@@ -0,0 +1,114 @@
+"""
+Set-based reads and writes of a user's interested tickers.
+
+Both kinds ("index" -> user_index_interest / stock_index, "stock" ->
+user_stock_interest / stock_batmmaan) are validated in one query and read in
+one query, and changes are applied as bulk INSERT / DELETE of the set
+difference, so the number of round trips does not grow with the number of
+tickers.
+"""
+from typing import Dict, Iterable, List, Set
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import StockBATMMAAN, StockIndex, user_index_interest, user_stock_interest
+
+# kind -> (association table, catalog ticker column)
+INTEREST_KINDS = {
+    "index": (user_index_interest, StockIndex.Ticker),
+    "stock": (user_stock_interest, StockBATMMAAN.Ticker),
+}
+
+UNKNOWN_TICKER_MESSAGES = {
+    "index": "지수 {ticker}가 존재하지 않습니다",
+    "stock": "종목 {ticker}가 존재하지 않습니다",
+}
+
+
+def _dedupe(tickers: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(tickers))
+
+
+async def find_unknown_tickers(
+    db: AsyncSession, selected: Dict[str, Iterable[str]]
+) -> Dict[str, List[str]]:
+    """Returns {kind: tickers missing from its catalog table}, in request order"""
+    selected = {kind: _dedupe(selected.get(kind, ())) for kind in INTEREST_KINDS}
+    lookups = [
+        select(literal(kind).label("kind"), column.label("ticker")).where(column.in_(tickers))
+        for kind, (_, column) in INTEREST_KINDS.items()
+        if (tickers := selected[kind])
+    ]
+    found: Set[tuple] = set()
+    if lookups:
+        found = {(row.kind, row.ticker) for row in await db.execute(union_all(*lookups))}
+    return {
+        kind: [ticker for ticker in tickers if (kind, ticker) not in found]
+        for kind, tickers in selected.items()
+    }
+
+
+async def validate_interests(db: AsyncSession, selected: Dict[str, Iterable[str]]):
+    """선택한 지수/종목을 한 번의 쿼리로 확인 (없는 티커가 있으면 400)"""
+    unknown = await find_unknown_tickers(db, selected)
+    for kind, tickers in unknown.items():
+        if tickers:
+            raise HTTPException(
+                status_code=400,
+                detail=UNKNOWN_TICKER_MESSAGES[kind].format(ticker=tickers[0]),
+            )
+
+
+async def get_interests(db: AsyncSession, user_id: str) -> Dict[str, Set[str]]:
+    """{kind: interested tickers} for one user"""
+    interests: Dict[str, Set[str]] = {kind: set() for kind in INTEREST_KINDS}
+    rows = await db.execute(
+        union_all(
+            *(
+                select(literal(kind).label("kind"), table.c.ticker).where(
+                    table.c.user_id == user_id
+                )
+                for kind, (table, _) in INTEREST_KINDS.items()
+            )
+        )
+    )
+    for row in rows:
+        interests[row.kind].add(row.ticker)
+    return interests
+
+
+async def add_interests(db: AsyncSession, user_id: str, selected: Dict[str, Iterable[str]]):
+    """Bulk-inserts association rows (one statement per kind). The caller commits."""
+    for kind, (table, _) in INTEREST_KINDS.items():
+        tickers = _dedupe(selected.get(kind, ()))
+        if tickers:
+            await db.execute(
+                insert(table), [{"user_id": user_id, "ticker": ticker} for ticker in tickers]
+            )
+
+
+async def replace_interests(
+    db: AsyncSession, user_id: str, selected: Dict[str, Iterable[str]]
+) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Makes the user's interests equal to `selected` by applying only the set
+    difference. Returns {"added": {kind: [...]}, "removed": {kind: [...]}}.
+    The caller commits.
+    """
+    current = await get_interests(db, user_id)
+    added: Dict[str, List[str]] = {}
+    removed: Dict[str, List[str]] = {}
+    for kind, (table, _) in INTEREST_KINDS.items():
+        wanted = set(selected.get(kind, ()))
+        added[kind] = sorted(wanted - current[kind])
+        removed[kind] = sorted(current[kind] - wanted)
+        if removed[kind]:
+            await db.execute(
+                delete(table).where(
+                    table.c.user_id == user_id, table.c.ticker.in_(removed[kind])
+                )
+            )
+    await add_interests(db, user_id, added)
+    return {"added": added, "removed": removed}
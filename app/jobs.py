@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.database import AsyncSessionLocal
+from app.models import JobRun
+
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+
+# Identifies this process among uvicorn workers and replicas
+NODE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+logger = logging.getLogger(__name__)
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class JobRunLease:
+    """
+    Lease on one run of a scheduled job (job_name, run_key), stored as a
+    job_runs row so it works on both Postgres and SQLite. Per-item progress
+    lives with the work itself (the email outbox), so a run taken over after
+    a crash resumes from there.
+    """
+
+    def __init__(self, job_name: str, run_key: str, lease_seconds: int = JOB_LEASE_SECONDS):
+        self.job_name = job_name
+        self.run_key = run_key
+        self.lease_seconds = lease_seconds
+        self.owner = f"{NODE_ID}:{uuid.uuid4().hex[:8]}"
+        self.lost = False
+
+    def _key_filter(self):
+        return (JobRun.job_name == self.job_name, JobRun.run_key == self.run_key)
+
+    async def acquire(self) -> bool:
+        now = utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+
+        async with AsyncSessionLocal() as db:
+            try:
+                await db.execute(
+                    insert(JobRun).values(
+                        job_name=self.job_name,
+                        run_key=self.run_key,
+                        owner=self.owner,
+                        status="running",
+                        lease_expires_at=expires_at,
+                        started_at=now,
+                    )
+                )
+                await db.commit()
+                return True
+            except IntegrityError:
+                await db.rollback()
+
+            # Run already exists: take it over only if its owner's lease expired
+            result = await db.execute(
+                update(JobRun)
+                .where(
+                    *self._key_filter(),
+                    JobRun.status == "running",
+                    JobRun.lease_expires_at < now,
+                )
+                .values(owner=self.owner, lease_expires_at=expires_at)
+            )
+            await db.commit()
+            return result.rowcount == 1
+
+    async def renew(self) -> bool:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(JobRun)
+                .where(*self._key_filter(), JobRun.owner == self.owner)
+                .values(lease_expires_at=utcnow() + timedelta(seconds=self.lease_seconds))
+            )
+            await db.commit()
+        if result.rowcount != 1:
+            self.lost = True
+        return not self.lost
+
+    async def finish(self, status: str):
+        """status="done"은 실행 완료, "running"은 lease만 반납 (다른 노드가 재개)"""
+        now = utcnow()
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(JobRun)
+                .where(*self._key_filter(), JobRun.owner == self.owner)
+                .values(
+                    status=status,
+                    lease_expires_at=now,
+                    finished_at=now if status == "done" else None,
+                )
+            )
+            await db.commit()
+
+    async def _heartbeat(self):
+        while not self.lost:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if not await self.renew():
+                    logger.error(f"Lost lease for {self.job_name}/{self.run_key}")
+            except Exception as e:
+                logger.error(f"Failed to renew lease for {self.job_name}/{self.run_key}: {e}")
+
+
+@asynccontextmanager
+async def job_run(job_name: str, run_key: str, lease_seconds: int = JOB_LEASE_SECONDS):
+    """
+    Yields a JobRunLease if this node should run (job_name, run_key), or None
+    when another node holds the lease or the run is already done.
+    """
+    lease = JobRunLease(job_name, run_key, lease_seconds)
+    if not await lease.acquire():
+        yield None
+        return
+
+    heartbeat = asyncio.create_task(lease._heartbeat())
+    status: Optional[str] = "running"
+    try:
+        yield lease
+        status = "done" if not lease.lost else None
+    finally:
+        heartbeat.cancel()
+        if status is not None:
+            await lease.finish(status)
+
+
+async def interrupted(job_name: str, run_key: str) -> bool:
+    """
+    True when (job_name, run_key) was started but not finished and its lease
+    expired: the owner crashed or gave up, and `job_run` can take it over.
+    """
+    async with AsyncSessionLocal() as db:
+        row = await db.execute(
+            select(JobRun.run_key).where(
+                JobRun.job_name == job_name,
+                JobRun.run_key == run_key,
+                JobRun.status == "running",
+                JobRun.lease_expires_at < utcnow(),
+            )
+        )
+        return row.first() is not None
@@ -1,7 +1,12 @@
+import heapq
 import os
 import logging
-from typing import List, Dict
-from sqlalchemy.orm import Session
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Iterable, List, Set
+from sqlalchemy import case, func, select, true, union, union_all
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import LLMNews, User, user_index_interest, user_stock_interest, NewsArticle
 
 LLM_BACKEND_URL = os.getenv("LLM_SERVER_URL")
@@ -13,88 +18,163 @@ SUMMARY_MAX_COUNT = 5
 logger = logging.getLogger(__name__)
 
 
-async def get_summaries_for_user(user: User, db: Session) -> List[Dict]:
+async def get_user_tickers(db: AsyncSession, user_ids: Iterable[str]) -> Dict[str, Set[str]]:
     """
-    Fetches news articles for the user's interested tickers, sends them to the LLM backend,
-    and returns the best summaries.
+    Returns {user_id: interested tickers} for all given users in two queries.
     """
-    summaries = []
-
-    index_interests = db.query(user_index_interest).filter_by(user_id=user.id).all()
-    stock_interests = db.query(user_stock_interest).filter_by(user_id=user.id).all()
-    tickers = list({row.ticker for row in index_interests + stock_interests})
-
-    logger.info(f"Interested tickers for user {user.id}: {tickers}")
-
-    for ticker in tickers:
-        # Query both NewsArticle and LLMNews
-        results = (
-            db.query(NewsArticle, LLMNews)
+    user_ids = list(user_ids)
+    interests: Dict[str, Set[str]] = {user_id: set() for user_id in user_ids}
+    if not user_ids:
+        return interests
+
+    for table in (user_index_interest, user_stock_interest):
+        rows = await db.execute(
+            select(table.c.user_id, table.c.ticker).where(table.c.user_id.in_(user_ids))
+        )
+        for row in rows:
+            interests[row.user_id].add(row.ticker)
+    return interests
+
+
+def ticker_candidates_query(
+    dialect: str,
+    tickers: Iterable[str],
+    per_ticker: int = ARTICLES_PER_TICKER,
+    min_len: int = SUMMARY_MIN_LEN,
+    max_len: int = SUMMARY_MAX_LEN,
+):
+    """
+    Ranking candidates of every ticker, ordered by ticker and `rank`:
+
+    - the latest `per_ticker` analyzed articles of each ticker, each read as
+      one backward range scan of ix_news_articles_ticker_id that stops after
+      `per_ticker` rows (LATERAL on Postgres, a UNION ALL of per-ticker LIMIT
+      subqueries elsewhere), then summaries shorter than `min_len` dropped
+    - `rank` orders all candidates once: summaries within `max_len` first
+      (`in_range`), then importance, arousal, valence (missing scores count
+      as 0), shorter summary, newer article
+    """
+    tickers = list(tickers)
+
+    def latest(ticker):
+        return (
+            select(
+                NewsArticle.id,
+                NewsArticle.ticker,
+                NewsArticle.title,
+                NewsArticle.real_url,
+                LLMNews.summary,
+                LLMNews.summary_length,
+                func.coalesce(LLMNews.importance_score, 0).label("importance"),
+                func.coalesce(LLMNews.arousal_score, 0).label("arousal"),
+                func.coalesce(LLMNews.valence_score, 0).label("valence"),
+            )
             .join(LLMNews, NewsArticle.id == LLMNews.id)
-            .filter(NewsArticle.ticker == ticker)
+            .where(NewsArticle.ticker == ticker)
             .order_by(NewsArticle.id.desc())
-            .limit(ARTICLES_PER_TICKER)
-            .all()
+            .limit(per_ticker)
         )
-        logger.info(f"Retrieved {len(results)} news articles for ticker {ticker}")
-
-        if not results:
-            continue
-
-        for article, llm_news in results:
-            summaries.append(
-                {
-                    "ticker": ticker,
-                    "title": article.title,
-                    "summary": llm_news.summary,
-                    "importance": llm_news.importance,
-                    "arousal": llm_news.arousal,
-                    "valence": llm_news.valence,
-                    "real_url": article.real_url
-                }
+
+    if dialect == "postgresql":
+        wanted = func.unnest(array(tickers)).table_valued("ticker").render_derived("wanted")
+        candidates = latest(wanted.c.ticker).lateral("candidates")
+        source = select(candidates).select_from(wanted).join(candidates, true())
+    else:
+        source = union_all(*(select(latest(t).subquery()) for t in tickers))
+    candidates = source.subquery("latest")
+
+    in_range = case((candidates.c.summary_length <= max_len, 1), else_=0)
+    ranked = (
+        select(
+            candidates,
+            in_range.label("in_range"),
+            func.row_number()
+            .over(
+                order_by=(
+                    in_range.desc(),
+                    candidates.c.importance.desc(),
+                    candidates.c.arousal.desc(),
+                    candidates.c.valence.desc(),
+                    candidates.c.summary_length,
+                    candidates.c.id.desc(),
+                )
             )
+            .label("rank"),
+        )
+        .where(candidates.c.summary_length >= min_len)
+        .subquery()
+    )
+    return select(ranked).order_by(ranked.c.ticker, ranked.c.rank)
+
 
-    return select_best_summaries(
-        summaries,
-        min_len=SUMMARY_MIN_LEN,
-        max_len=SUMMARY_MAX_LEN,
-        max_count=SUMMARY_MAX_COUNT,
+async def get_ticker_candidates(
+    db: AsyncSession,
+    tickers: Iterable[str],
+    per_ticker: int = ARTICLES_PER_TICKER,
+) -> Dict[str, List[Dict]]:
+    """
+    Returns {ticker: candidates in rank order} in one query. Jobs load this
+    once per run and pick every user's summaries from it, so DB work scales
+    with tickers, not users.
+    """
+    tickers = sorted(set(tickers))
+    candidates: Dict[str, List[Dict]] = {ticker: [] for ticker in tickers}
+    if not tickers:
+        return candidates
+
+    rows = await db.execute(
+        ticker_candidates_query(db.bind.dialect.name, tickers, per_ticker=per_ticker)
     )
+    for row in rows:
+        candidates[row.ticker].append(
+            {
+                "id": row.id,
+                "ticker": row.ticker,
+                "title": row.title,
+                "summary": row.summary,
+                "importance": row.importance,
+                "arousal": row.arousal,
+                "valence": row.valence,
+                "real_url": row.real_url,
+                "in_range": row.in_range,
+                "rank": row.rank,
+            }
+        )
+    return candidates
 
 
-def select_best_summaries(
-    summaries: List[Dict], min_len: int = 150, max_len: int = 400, max_count: int = 5
+def select_summaries_for_tickers(
+    tickers: Iterable[str],
+    candidates: Dict[str, List[Dict]],
+    max_count: int = SUMMARY_MAX_COUNT,
+    strict: bool = True,
 ) -> List[Dict]:
     """
-    Selects the best summaries based on length and importance/arousal/valence.
+    Top `max_count` candidates of `tickers`: a merge of the ranked per-ticker
+    lists, so it costs O(max_count), not the number of candidates. With
+    `strict`, summaries longer than SUMMARY_MAX_LEN are only used when none
+    fit; otherwise they follow the ones that do.
     """
+    merged = heapq.merge(
+        *(candidates.get(ticker, ()) for ticker in tickers), key=itemgetter("rank")
+    )
+    picks = list(islice(merged, max_count))
+    if strict and picks and picks[0]["in_range"]:
+        picks = [item for item in picks if item["in_range"]]
+    return picks
 
-    def summary_len(s: Dict) -> int:
-        return len(s.get("summary", ""))
-    
-    def safe_float(value, default=0.0):
-        """Convert string values to float safely"""
-        try:
-            return float(value) if value is not None else default
-        except (ValueError, TypeError):
-            return default
-
-    # Filter summaries within length range
-    in_range = [s for s in summaries if min_len <= summary_len(s) <= max_len]
-
-    # If none in range, take the shortest longer summaries
-    if not in_range:
-        over_range = [s for s in summaries if summary_len(s) > max_len]
-        over_range.sort(key=summary_len)
-        in_range = over_range
-
-    # Sort by importance, then arousal, then valence (all descending)
-    in_range.sort(
-        key=lambda s: (
-            -safe_float(s.get("importance")),
-            -safe_float(s.get("arousal")),
-            -safe_float(s.get("valence")),
-        )
+
+def interest_tickers_query():
+    """Every ticker that at least one user is interested in"""
+    return union(
+        *(select(table.c.ticker) for table in (user_index_interest, user_stock_interest))
     )
 
-    return in_range[:max_count]
+
+async def get_summaries_for_user(user: User, db: AsyncSession) -> List[Dict]:
+    """
+    Returns the best summaries for the user's interested tickers.
+    """
+    tickers = (await get_user_tickers(db, [user.id]))[user.id]
+    candidates = await get_ticker_candidates(db, tickers)
+    return select_summaries_for_tickers(tickers, candidates)
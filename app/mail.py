@@ -1,266 +1,248 @@
 from datetime import datetime
+from functools import lru_cache
 from typing import List
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup, escape
 from fastapi_utilities import repeat_at, repeat_every
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
+from fastapi_mail import ConnectionConfig
 from pydantic import BaseModel, EmailStr
-from os import getenv
+from sqlalchemy import select
+from os import getenv, path
 import logging
-from app.database import get_db
-from app.llm import get_summaries_for_user
+import time
+from app.database import AsyncSessionLocal
+from app.jobs import JOB_LEASE_SECONDS, interrupted, job_run
+from app.llm import (
+    get_ticker_candidates,
+    get_user_tickers,
+    interest_tickers_query,
+    select_summaries_for_tickers,
+)
+from app.metrics import (
+    newsletter_emails_queued_total,
+    newsletter_run_duration_seconds,
+    newsletter_runs_total,
+    newsletter_users_processed_total,
+)
 from app.models import User
+from app.outbox import drain_outbox, enqueue_emails, existing_keys
+from app.sql_profiler import profiled_job
 
 class EmailSchema(BaseModel):
     email: List[EmailStr]
 
-conf = ConnectionConfig(
-    MAIL_USERNAME = getenv("MAIL_USERNAME"),
-    MAIL_PASSWORD = getenv("MAIL_PASSWORD"),
-    MAIL_FROM = getenv("MAIL_FROM"),
-    MAIL_PORT = getenv("MAIL_PORT"),
-    MAIL_SERVER = getenv("MAIL_SERVER"),
-    MAIL_FROM_NAME=getenv("MAIL_FROM_NAME"),
-    MAIL_STARTTLS = True,
-    MAIL_SSL_TLS = False,
-    USE_CREDENTIALS = True,
-    VALIDATE_CERTS = True
-)
+@lru_cache(maxsize=1)
+def get_mail_config() -> ConnectionConfig:
+    """메일 설정 (처음 발송할 때 한 번 생성)"""
+    return ConnectionConfig(
+        MAIL_USERNAME = getenv("MAIL_USERNAME"),
+        MAIL_PASSWORD = getenv("MAIL_PASSWORD"),
+        MAIL_FROM = getenv("MAIL_FROM"),
+        MAIL_PORT = getenv("MAIL_PORT"),
+        MAIL_SERVER = getenv("MAIL_SERVER"),
+        MAIL_FROM_NAME=getenv("MAIL_FROM_NAME"),
+        MAIL_STARTTLS = getenv("MAIL_STARTTLS", "true").lower() == "true",
+        MAIL_SSL_TLS = getenv("MAIL_SSL_TLS", "false").lower() == "true",
+        USE_CREDENTIALS = getenv("MAIL_USE_CREDENTIALS", "true").lower() == "true",
+        VALIDATE_CERTS = getenv("MAIL_VALIDATE_CERTS", "true").lower() == "true"
+    )
+
+NEWSLETTER_USER_CHUNK_SIZE = int(getenv("NEWSLETTER_USER_CHUNK_SIZE", "500"))
+OUTBOX_POLL_SECONDS = int(getenv("OUTBOX_POLL_SECONDS", "60"))
+# how often each node looks for an interrupted run of today's newsletter
+NEWSLETTER_RESUME_SECONDS = int(getenv("NEWSLETTER_RESUME_SECONDS", str(JOB_LEASE_SECONDS)))
 logger = logging.getLogger(__name__)
 
-def build_email_body(user_name: str, summaries: list[dict]) -> str:
-    """모던하고 세련된 HTML 이메일 템플릿 생성"""
-    current_date = datetime.now().strftime("%Y년 %m월 %d일")
-    
-    # 메인 스타일
-    styles = """
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+KR:wght@300;400;500;700&display=swap');
-        
-        body {
-            margin: 0;
-            padding: 0;
-            font-family: 'Noto Sans KR', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background-color: #f8fafc;
-            line-height: 1.6;
-        }
-        
-        .container {
-            max-width: 600px;
-            margin: 0 auto;
-            background-color: #ffffff;
-            box-shadow: 0 10px 25px rgba(0,0,0,0.1);
-        }
-        
-        .header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 40px 30px;
-            text-align: center;
-            color: white;
-        }
-        
-        .header h1 {
-            margin: 0;
-            font-size: 28px;
-            font-weight: 700;
-            margin-bottom: 8px;
-        }
-        
-        .header .date {
-            font-size: 16px;
-            opacity: 0.9;
-            font-weight: 300;
-        }
-        
-        .greeting {
-            padding: 30px;
-            background-color: #ffffff;
-            border-bottom: 1px solid #e2e8f0;
-        }
-        
-        .greeting h2 {
-            margin: 0;
-            font-size: 20px;
-            color: #2d3748;
-            font-weight: 500;
-        }
-        
-        .content {
-            padding: 20px 30px;
-        }
-        
-        .news-item {
-            background-color: #ffffff;
-            border: 1px solid #e2e8f0;
-            border-radius: 12px;
-            margin-bottom: 20px;
-            padding: 25px;
-            transition: transform 0.2s ease;
-        }
-        
-        .news-item:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 8px 25px rgba(0,0,0,0.1);
-        }
-        
-        .ticker {
-            display: inline-block;
-            background: linear-gradient(45deg, #4299e1, #3182ce);
-            color: white;
-            padding: 4px 12px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 600;
-            margin-bottom: 12px;
-            letter-spacing: 0.5px;
-        }
-        
-        .news-title {
-            font-size: 18px;
-            font-weight: 600;
-            color: #2d3748;
-            margin-bottom: 15px;
-            line-height: 1.4;
-        }
-        
-        .news-summary {
-            color: #4a5568;
-            font-size: 14px;
-            line-height: 1.6;
-            background-color: #f7fafc;
-            padding: 15px;
-            border-radius: 8px;
-            border-left: 4px solid #4299e1;
-        }
-        
-        .footer {
-            background-color: #2d3748;
-            padding: 30px;
-            text-align: center;
-            color: #a0aec0;
-        }
-        
-        .footer p {
-            margin: 0;
-            font-size: 14px;
-        }
-        
-        .unsubscribe {
-            margin-top: 15px;
-            font-size: 12px;
-        }
-        
-        .unsubscribe a {
-            color: #4299e1;
-            text-decoration: none;
-        }
-        
-        @media only screen and (max-width: 600px) {
-            .container {
-                margin: 0;
-            }
-            
-            .header, .greeting, .content, .footer {
-                padding-left: 20px;
-                padding-right: 20px;
-            }
-            
-            .header h1 {
-                font-size: 24px;
-            }
-            
-            .news-item {
-                padding: 20px;
-            }
-        }
-    </style>
-    """
-    
-    # HTML 구조
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="ko">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>FinanceFlow 뉴스레터</title>
-        {styles}
-    </head>
-    <body>
-        <div class="container">
-            <!-- Header -->
-            <div class="header">
-                <h1>FinanceFlow 뉴스레터</h1>
-                <div class="date">{current_date}</div>
-            </div>
-            
-            <!-- Greeting -->
-            <div class="greeting">
-                <h2>안녕하세요, {user_name}님! 👋</h2>
-                <p style="margin: 10px 0 0 0; color: #718096;">오늘도 중요한 뉴스를 요약해서 전해드립니다.</p>
-            </div>
-            
-            <!-- Content -->
-            <div class="content">
+templates = Environment(
+    loader=FileSystemLoader(path.join(path.dirname(__file__), "templates")),
+    autoescape=select_autoescape(["html"]),
+)
+
+class NewsletterRenderer:
     """
-    
-    # 뉴스 아이템들 추가
-    for item in summaries:
-        html_content += f"""
-                <div class="news-item">
-                    <div class="ticker">{item['ticker']}</div>
-                    <div class="news-title"><a href="{item['real_url']}">{item['title']}</a></div>
-                    <div class="news-summary">
-                        <strong>📝 요약:</strong><br>
-                        {item['summary']}
-                    </div>
-                </div>
-        """
-    
-    # Footer 추가
-    html_content += f"""
-            </div>
-            
-            <!-- Footer -->
-            <div class="footer">
-                <p>📊 <strong>FinanceFlow 뉴스레터</strong></p>
-                <p>매일 아침 신선한 뉴스를 전해드립니다</p>
-                <div class="unsubscribe">
-                    <p>수신 거부를 원하시면 <a href="mailto:{getenv('MAIL_FROM')}?subject=Unsubscribe">여기를 클릭하세요</a>.</p>
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>
+    Renders newsletters for one run: the static shell is rendered once and
+    each article fragment once, then reused for every user digest.
     """
-    
-    return html_content
 
-db = get_db()
+    _USER_MARKER = "\x00user_name\x00"
+    _ITEMS_MARKER = "\x00items\x00"
+
+    def __init__(self, current_date: str | None = None):
+        current_date = current_date or datetime.now().strftime("%Y년 %m월 %d일")
+        shell = templates.get_template("newsletter/base.html").render(
+            current_date=current_date,
+            unsubscribe_email=getenv("MAIL_FROM"),
+            user_name=Markup(self._USER_MARKER),
+            items=Markup(self._ITEMS_MARKER),
+        )
+        self._head, rest = shell.split(self._USER_MARKER)
+        self._middle, self._tail = rest.split(self._ITEMS_MARKER)
+        self._item_template = templates.get_template("newsletter/item.html")
+        self._fragments: dict = {}
+        self.rendered = 0
+        self.render_seconds = 0.0
+        self.max_render_seconds = 0.0
+
+    def _fragment(self, item: dict) -> str:
+        key = item.get("id") or (item["ticker"], item["real_url"], item["title"])
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            fragment = self._fragments[key] = self._item_template.render(item=item)
+        return fragment
+
+    def render(self, user_name: str, summaries: list[dict]) -> str:
+        start = time.perf_counter()
+        html_content = "".join(
+            [
+                self._head,
+                escape(user_name),
+                self._middle,
+                *(self._fragment(item) for item in summaries),
+                self._tail,
+            ]
+        )
+        elapsed = time.perf_counter() - start
+        self.rendered += 1
+        self.render_seconds += elapsed
+        self.max_render_seconds = max(self.max_render_seconds, elapsed)
+        return html_content
+
+    def stats(self) -> dict:
+        return {
+            "rendered": self.rendered,
+            "fragments": len(self._fragments),
+            "avg_render_ms": round(self.render_seconds / self.rendered * 1000, 3)
+            if self.rendered
+            else 0.0,
+            "max_render_ms": round(self.max_render_seconds * 1000, 3),
+        }
+
+
+def build_email_body(user_name: str, summaries: list[dict]) -> str:
+    """모던하고 세련된 HTML 이메일 템플릿 생성"""
+    return NewsletterRenderer().render(user_name, summaries)
+
+
+def newsletter_run_key() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
 
 #@repeat_every(seconds=60 * 60 * 24, raise_exceptions=True)
-@repeat_at(cron="0 0 * * *", raise_exceptions=True)
+@repeat_at(cron="0 0 * * *", logger=logger)
+@profiled_job("newsletter")
 async def send_newsletter():
     """
     사용자들에게 개인화된 뉴스레터를 발송합니다.
+    여러 워커/레플리카 중 lease를 얻은 하나만 outbox에 적재하며, 중단된 실행은
+    resume_newsletter가 이어서 적재합니다. 오류는 기록만 하고 다음 날 일정은 유지됩니다.
     """
-    db_session = next(db)
-    user_list = db_session.query(User).filter(User.email_opt_in).all()
-
-    for user in user_list:
-        try:
-            summaries = await get_summaries_for_user(user, db_session)
-            if summaries:
-                html_body = build_email_body(user.name, summaries)
-                fm = FastMail(conf)
-                message = MessageSchema(
-                    subject=f'{datetime.now().strftime("%m월 %d일")} FinanceFlow 뉴스레터',
-                    recipients=[user.email],
-                    body=html_body,
-                    subtype=MessageType.html,
-                )
-                await fm.send_message(message)
-                logger.info(f"Newsletter sent successfully to {user.email}")
-            else:
-                logger.info(f"No summaries available for user {user.email}")
-                
-        except Exception as e:
-            logger.error(f"Failed to send newsletter to {user.email}: {str(e)}")
+    await run_newsletter(newsletter_run_key())
+
+
+@repeat_every(seconds=NEWSLETTER_RESUME_SECONDS, logger=logger)
+@profiled_job("newsletter_resume")
+async def resume_newsletter():
+    """
+    시작 시와 주기적으로, lease가 만료된 채 남은 오늘 뉴스레터 실행을 넘겨받아
+    적재되지 않은 사용자부터 이어서 적재합니다 (적재된 사용자는 idempotency key로 건너뜀).
+    """
+    run_key = newsletter_run_key()
+    if await interrupted("newsletter", run_key):
+        logger.warning(f"Newsletter {run_key} was interrupted, resuming")
+        await run_newsletter(run_key)
+
+
+async def run_newsletter(run_key: str):
+    """Runs (or takes over) the newsletter for run_key, then drains the outbox"""
+    started = time.perf_counter()
+
+    try:
+        async with job_run("newsletter", run_key) as run:
+            if run is None:
+                logger.info(f"Newsletter {run_key} is running or done on another node")
+                newsletter_runs_total.inc("skipped")
+                return
+
+            queued = await enqueue_newsletters(run, run_key)
+            logger.info(f"Newsletter {run_key}: {queued} emails queued")
+
+        counts = await drain_outbox(get_mail_config)
+        logger.info(f"Outbox drained: {counts}")
+    except Exception:
+        newsletter_runs_total.inc("error")
+        raise
+    newsletter_runs_total.inc("done")
+    newsletter_run_duration_seconds.observe(value=time.perf_counter() - started)
+
+
+@repeat_every(seconds=OUTBOX_POLL_SECONDS, logger=logger)
+@profiled_job("outbox")
+async def process_outbox():
+    """재시도 대기 중인 메일을 포함해 outbox를 주기적으로 발송합니다."""
+    counts = await drain_outbox(get_mail_config)
+    if any(counts.values()):
+        logger.info(f"Outbox drained: {counts}")
+
+
+async def enqueue_newsletters(run, run_key: str) -> int:
+    """
+    구독자를 NEWSLETTER_USER_CHUNK_SIZE 단위로 조회하여 뉴스레터를 outbox에 적재.
+    idempotency key(newsletter:{run_key}:{user_id})가 이미 있는 사용자는 건너뜀.
+    """
+    subject = f'{datetime.now().strftime("%m월 %d일")} FinanceFlow 뉴스레터'
+    renderer = NewsletterRenderer()
+    queued = 0
+    last_id = None
+
+    async with AsyncSessionLocal() as db_session:
+        # Per-ticker candidates are loaded once per run; chunks only pick from them
+        tickers = (await db_session.execute(interest_tickers_query())).scalars().all()
+        candidates = await get_ticker_candidates(db_session, tickers)
+
+        while not run.lost:
+            query = select(User).filter(User.email_opt_in).order_by(User.id)
+            if last_id is not None:
+                query = query.filter(User.id > last_id)
+            user_list = (
+                await db_session.execute(query.limit(NEWSLETTER_USER_CHUNK_SIZE))
+            ).scalars().all()
+            if not user_list:
+                break
+            last_id = user_list[-1].id
+
+            keys = {user.id: f"newsletter:{run_key}:{user.id}" for user in user_list}
+            done = await existing_keys(db_session, keys.values())
+            user_list = [user for user in user_list if keys[user.id] not in done]
+
+            interests = await get_user_tickers(db_session, [user.id for user in user_list])
+
+            emails = []
+            for user in user_list:
+                try:
+                    summaries = select_summaries_for_tickers(interests[user.id], candidates)
+                    if summaries:
+                        emails.append(
+                            {
+                                "idempotency_key": keys[user.id],
+                                "recipient": user.email,
+                                "subject": subject,
+                                "body": renderer.render(user.name, summaries),
+                            }
+                        )
+                    else:
+                        logger.info(f"No summaries available for user {user.email}")
+
+                except Exception as e:
+                    logger.error(f"Failed to build newsletter for {user.email}: {str(e)}")
+
+            added = await enqueue_emails(db_session, emails)
+            queued += added
+            newsletter_users_processed_total.inc(amount=len(user_list))
+            newsletter_emails_queued_total.inc(amount=added)
+            await db_session.commit()
+            db_session.expunge_all()
+
+    if run.lost:
+        logger.error("Newsletter lease lost, stopping this node's run")
+    logger.info(f"Newsletter render stats: {renderer.stats()}")
+    return queued
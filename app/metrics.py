@@ -0,0 +1,294 @@
+"""
+Request and job metrics in Prometheus text format, served at /internal/metrics.
+
+Metrics are plain per-process counters, gauges and fixed-bucket histograms.
+They are only updated from the event loop thread (the ASGI middleware and
+the async jobs), so recording takes no lock: a counter increment is a dict
+update and a histogram observation is a bisect plus two additions.
+
+With several uvicorn workers each process only sees its own requests. Set
+METRICS_DIR to a directory shared by the workers (cleared on deploy, like
+prometheus_client's multiprocess mode): every worker then writes a snapshot
+there every METRICS_FLUSH_SECONDS and /internal/metrics sums the snapshots
+of all workers. Gauges are only summed over workers whose snapshot is
+recent, so a dead worker's in-flight requests do not linger.
+"""
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi_utilities import repeat_every
+
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_DURATION_BUCKETS = (1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 1800.0, 3600.0)
+
+logger = logging.getLogger(__name__)
+
+Labels = Tuple[str, ...]
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Labels, object] = {}
+
+    def snapshot(self) -> dict:
+        return {"values": [[list(labels), value] for labels, value in self.values.items()]}
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+    def set(self, *labels: str, value: float):
+        self.values[labels] = value
+
+
+class Histogram(_Metric):
+    """Per label set: [count per bucket (+Inf last), sum]; cumulated on render"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *labels: str, value: float):
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "written_at": time.time(),
+            "metrics": {name: metric.snapshot() for name, metric in self.metrics.items()},
+        }
+
+    # Multi-worker snapshots
+
+    def flush(self, directory: str):
+        """Writes this process's snapshot atomically to <directory>/<pid>.json"""
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def collect(self, directory: Optional[str] = None) -> List[dict]:
+        """This process's live snapshot plus the other workers' flushed ones"""
+        snapshots = [self.snapshot()]
+        if not directory or not os.path.isdir(directory):
+            return snapshots
+        for entry in os.scandir(directory):
+            if not entry.name.endswith(".json") or entry.name == f"{os.getpid()}.json":
+                continue
+            try:
+                with open(entry.path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping metrics snapshot {entry.name}: {str(e)}")
+        return snapshots
+
+    def render(self, snapshots: Iterable[dict]) -> str:
+        """Merges snapshots (sum per label set) into Prometheus text format"""
+        snapshots = list(snapshots)
+        gauge_cutoff = time.time() - 3 * METRICS_FLUSH_SECONDS
+        lines = []
+        for name, metric in self.metrics.items():
+            merged: Dict[Labels, object] = {}
+            for snapshot in snapshots:
+                if metric.type == "gauge" and snapshot["pid"] != os.getpid():
+                    if snapshot["written_at"] < gauge_cutoff:
+                        continue
+                values = snapshot["metrics"].get(name, {}).get("values", [])
+                for labels, value in values:
+                    _merge(merged, tuple(labels), value)
+
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for labels, value in sorted(merged.items()):
+                label_pairs = list(zip(metric.labelnames, labels))
+                if metric.type != "histogram":
+                    lines.append(f"{name}{_format_labels(label_pairs)} {_format_value(value)}")
+                    continue
+                counts, total = value
+                cumulative = 0
+                for bound, count in zip((*metric.buckets, float("inf")), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    lines.append(
+                        f"{name}_bucket{_format_labels([*label_pairs, ('le', le)])} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{_format_labels(label_pairs)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(label_pairs)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _merge(merged: Dict[Labels, object], labels: Labels, value):
+    current = merged.get(labels)
+    if current is None:
+        merged[labels] = [list(value[0]), value[1]] if isinstance(value, list) else value
+    elif isinstance(value, list):
+        current[0] = [a + b for a, b in zip(current[0], value[0])]
+        current[1] += value[1]
+    else:
+        merged[labels] = current + value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+registry = Registry()
+
+# HTTP
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("method",)
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response is fully sent",
+    ("method", "route"),
+)
+
+# Newsletter / outbox
+newsletter_runs_total = registry.counter(
+    "newsletter_runs_total", "Newsletter runs by outcome", ("result",)
+)
+newsletter_users_processed_total = registry.counter(
+    "newsletter_users_processed_total", "Subscribers considered by newsletter runs"
+)
+newsletter_emails_queued_total = registry.counter(
+    "newsletter_emails_queued_total", "Newsletter emails added to the outbox"
+)
+newsletter_run_duration_seconds = registry.histogram(
+    "newsletter_run_duration_seconds",
+    "Newsletter run duration (enqueue and first drain)",
+    buckets=JOB_DURATION_BUCKETS,
+)
+outbox_emails_total = registry.counter(
+    "outbox_emails_total",
+    "Outbox send attempts by resulting status (sent, pending = will retry, dead)",
+    ("status",),
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route counts, status codes and latency,
+    plus in-flight requests. Routes are labelled by their path template
+    (/news/{ticker}) as resolved by the router, so label cardinality is
+    bounded by the route table. The route is only known once routing ran,
+    so the in-flight gauge is labelled by method.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec(method)
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            http_request_duration_seconds.observe(method, route, value=elapsed)
+            http_requests_total.inc(method, route, status)
+
+
+def render_metrics() -> str:
+    return registry.render(registry.collect(METRICS_DIR))
+
+
+@repeat_every(seconds=METRICS_FLUSH_SECONDS, logger=logger)
+async def flush_metrics():
+    """METRICS_DIR에 이 워커의 스냅샷을 주기적으로 기록합니다."""
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    registry.flush(METRICS_DIR)
@@ -1,14 +1,23 @@
 from sqlalchemy import (
     Text,
     Date,
+    DateTime,
     Column,
+    Computed,
+    Float,
     String,
     Table,
     ForeignKey,
     Boolean,
+    Index,
+    Integer,
     UniqueConstraint,
+    func,
+    literal_column,
 )
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.functions import FunctionElement
 from app.database import Base
 
 user_index_interest = Table(
@@ -16,6 +25,8 @@ user_index_interest = Table(
     Base.metadata,
     Column("user_id", String, ForeignKey("users.id"), primary_key=True),
     Column("ticker", String, ForeignKey("stock_index.Ticker"), primary_key=True),
+    # feed refresh: users of the tickers whose news changed
+    Index("ix_user_index_interest_ticker", "ticker"),
 )
 
 user_stock_interest = Table(
@@ -23,6 +34,8 @@ user_stock_interest = Table(
     Base.metadata,
     Column("user_id", String, ForeignKey("users.id"), primary_key=True),
     Column("ticker", String, ForeignKey("stock_batmmaan.Ticker"), primary_key=True),
+    # feed refresh: users of the tickers whose news changed
+    Index("ix_user_stock_interest_ticker", "ticker"),
 )
 
 
@@ -68,8 +81,16 @@ class NewsArticle(Base):
     title = Column(String)
     article = Column(Text)
     real_url = Column(String)
-
-    __table_args__ = (UniqueConstraint("real_url", "title", name="uq_realurl_title"),)
+    # set by the database so rows written by the collector are stamped too
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("real_url", "title", name="uq_realurl_title"),
+        # /news/{ticker}, /news/{ticker}/{date}, /news/dates/{ticker}
+        Index("ix_news_articles_ticker_date_id", "ticker", date.desc(), "id"),
+        # newsletter: latest articles per ticker ordered by id
+        Index("ix_news_articles_ticker_id", "ticker", "id"),
+    )
 
 
 class SeenLinks(Base):
@@ -78,6 +99,31 @@ class SeenLinks(Base):
     rss_url = Column(String, primary_key=True)
 
 
+class parse_score(FunctionElement):
+    """LLM 점수 문자열 -> 실수 (숫자가 아니면 Postgres는 NULL, SQLite는 0)"""
+
+    type = Float()
+    name = "parse_score"
+    inherit_cache = True
+
+
+SCORE_PATTERN = r"^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]{1,2})?\s*$"
+
+
+@compiles(parse_score)
+def _parse_score(element, compiler, **kw):
+    return f"CAST({compiler.process(element.clauses, **kw)} AS REAL)"
+
+
+@compiles(parse_score, "postgresql")
+def _parse_score_postgresql(element, compiler, **kw):
+    value = compiler.process(element.clauses, **kw)
+    return (
+        f"CASE WHEN {value} ~ '{SCORE_PATTERN}' "
+        f"THEN CAST({value} AS DOUBLE PRECISION) END"
+    )
+
+
 class LLMNews(Base):
     __tablename__ = "llm_news"
 
@@ -87,3 +133,109 @@ class LLMNews(Base):
     arousal = Column(String)
     importance = Column(String)
     summary = Column(Text)
+
+    # Derived by the database from the columns the LLM pipeline writes
+    valence_score = Column(Float, Computed(parse_score(valence), persisted=True))
+    arousal_score = Column(Float, Computed(parse_score(arousal), persisted=True))
+    importance_score = Column(
+        Float, Computed(parse_score(importance), persisted=True)
+    )
+    summary_length = Column(
+        Integer,
+        Computed(func.char_length(literal_column("summary")), persisted=True),
+    )
+
+
+class NewsDate(Base):
+    """news_articles의 (ticker, date)별 기사/분석 건수 (DB 트리거로 유지, app/news_dates.py)"""
+
+    __tablename__ = "news_dates"
+
+    ticker = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    article_count = Column(Integer, nullable=False, default=0)
+    analyzed_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # feed refresh: rows changed since the oldest feed watermark
+        Index("ix_news_dates_updated_at", "updated_at"),
+    )
+
+
+class SeedState(Base):
+    """시드 파일별 마지막으로 적용한 내용 해시 (변경이 없으면 시딩 생략)"""
+
+    __tablename__ = "seed_state"
+
+    name = Column(String, primary_key=True)
+    content_hash = Column(String, nullable=False)
+    row_count = Column(Integer, nullable=False)
+    applied_at = Column(DateTime)
+
+
+class UserFeed(Base):
+    """사용자별 개인화 피드 상태 (app/feed.py가 갱신)"""
+
+    __tablename__ = "user_feeds"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    item_count = Column(Integer, nullable=False, default=0)
+    # when the items last changed (feed ETag / Last-Modified)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now())
+    # news_dates changes up to here (DB clock) are reflected; NULL = rebuild
+    watermark = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # feed refresh: the oldest watermark and the feeds marked for rebuild
+        Index("ix_user_feeds_watermark", "watermark"),
+    )
+
+
+class UserFeedItem(Base):
+    """피드 항목 (user_id, position) 순서대로 저장, 페이지는 position 기준"""
+
+    __tablename__ = "user_feed_items"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    news_id = Column(String, ForeignKey("news_articles.id"), nullable=False)
+
+
+class JobRun(Base):
+    """스케줄 작업 실행 단위 lease (여러 워커/레플리카 중 하나만 실행)"""
+
+    __tablename__ = "job_runs"
+
+    job_name = Column(String, primary_key=True)
+    run_key = Column(String, primary_key=True)
+    owner = Column(String)
+    status = Column(String, default="running")
+    lease_expires_at = Column(DateTime)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+
+class EmailOutbox(Base):
+    """발송 대기 메일 (재시도 / dead-letter 포함)"""
+
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    idempotency_key = Column(String, unique=True, nullable=False)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    next_attempt_at = Column(DateTime, nullable=False)
+    locked_until = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime)
+    sent_at = Column(DateTime)
+
+    __table_args__ = (
+        # workers claim due rows by (status, next_attempt_at)
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
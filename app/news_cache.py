@@ -0,0 +1,247 @@
+"""
+Server-side cache for /news responses.
+
+Entries are pre-serialized response bodies plus their HTTP validators, stored
+per ticker in a pluggable backend: an in-process LRU by default, or a shared
+Redis when NEWS_CACHE_URL is set (any Redis-protocol server works, e.g. a
+local redis-server or fakeredis in development). Concurrent misses for the
+same key are coalesced so only one request runs the query.
+
+Callers key entries by the response ETag, which covers the ticker's
+news_dates rollup (kept by database triggers, so crawler writes count too).
+Any write to a ticker's news therefore moves its requests to new keys, in
+every worker, and the old entries simply age out after NEWS_CACHE_TTL;
+nothing has to be invalidated for correctness. `invalidate` only frees
+memory (in the serving worker, for the memory backend).
+"""
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Optional
+
+from app.cache import CACHES, TTLCache
+
+NEWS_CACHE_URL = os.getenv("NEWS_CACHE_URL")
+NEWS_CACHE_SIZE = int(os.getenv("NEWS_CACHE_SIZE", "2048"))
+NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "30"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class NewsCacheEntry:
+    """A serialized response body with the validators it was served with"""
+
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+    cache_control: str
+
+    def to_bytes(self) -> bytes:
+        header = {
+            "etag": self.etag,
+            "last_modified": self.last_modified.isoformat() if self.last_modified else None,
+            "cache_control": self.cache_control,
+        }
+        return json.dumps(header).encode("utf-8") + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "NewsCacheEntry":
+        header, body = data.split(b"\n", 1)
+        header = json.loads(header)
+        last_modified = header["last_modified"]
+        return cls(
+            body=body,
+            etag=header["etag"],
+            last_modified=datetime.fromisoformat(last_modified) if last_modified else None,
+            cache_control=header["cache_control"],
+        )
+
+
+class MemoryBackend:
+    """Process-local LRU; entries are keyed by (ticker, key)"""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int = NEWS_CACHE_SIZE):
+        self._cache = TTLCache("news_responses", maxsize=maxsize, ttl=NEWS_CACHE_TTL)
+
+    def get(self, ticker: str, key: str) -> Optional[NewsCacheEntry]:
+        return self._cache.get((ticker, key))
+
+    def set(self, ticker: str, key: str, entry: NewsCacheEntry, ttl: float):
+        self._cache.set((ticker, key), entry, ttl=ttl)
+
+    def invalidate(self, ticker: Optional[str] = None):
+        if ticker is None:
+            self._cache.clear()
+        else:
+            self._cache.invalidate_where(lambda cache_key: cache_key[0] == ticker)
+
+
+class RedisBackend:
+    """
+    Shared backend: one Redis hash per ticker, so invalidating a ticker is a
+    single DEL. The hash expires NEWS_CACHE_TTL after its last write.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "NEWS_CACHE_URL is set but the redis package is not installed"
+            ) from e
+        self._client = redis.Redis.from_url(url)
+
+    @staticmethod
+    def _hash(ticker: str) -> str:
+        return f"news:{ticker}"
+
+    def get(self, ticker: str, key: str) -> Optional[NewsCacheEntry]:
+        data = self._client.hget(self._hash(ticker), key)
+        return NewsCacheEntry.from_bytes(data) if data is not None else None
+
+    def set(self, ticker: str, key: str, entry: NewsCacheEntry, ttl: float):
+        pipe = self._client.pipeline()
+        pipe.hset(self._hash(ticker), key, entry.to_bytes())
+        pipe.expire(self._hash(ticker), max(1, int(ttl)))
+        pipe.execute()
+
+    def invalidate(self, ticker: Optional[str] = None):
+        if ticker is not None:
+            self._client.delete(self._hash(ticker))
+            return
+        keys = list(self._client.scan_iter(match="news:*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs at most one loader per key at a time. Callers that arrive while a
+    load is in progress wait for it and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def do(self, key: Hashable, fn: Callable):
+        """Returns (result, shared) where shared is True for coalesced callers"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+
+class NewsResponseCache:
+    def __init__(self, backend, ttl: float = NEWS_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+        CACHES["news"] = self
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _backend_get(self, ticker: str, key: str) -> Optional[NewsCacheEntry]:
+        try:
+            return self.backend.get(ticker, key)
+        except Exception as e:
+            # A shared backend outage degrades to uncached reads
+            self._count("errors")
+            logger.warning(f"News cache read failed: {str(e)}")
+            return None
+
+    def get_or_load(
+        self, ticker: str, key: str, loader: Callable[[], NewsCacheEntry]
+    ) -> NewsCacheEntry:
+        entry = self._backend_get(ticker, key)
+        if entry is not None:
+            self._count("hits")
+            return entry
+        self._count("misses")
+
+        def load() -> NewsCacheEntry:
+            entry = loader()
+            self._count("loads")
+            try:
+                self.backend.set(ticker, key, entry, self.ttl)
+            except Exception as e:
+                self._count("errors")
+                logger.warning(f"News cache write failed: {str(e)}")
+            return entry
+
+        entry, shared = self._flight.do((ticker, key), load)
+        if shared:
+            self._count("coalesced")
+        return entry
+
+    def invalidate(self, ticker: Optional[str] = None):
+        """Drops a ticker's entries, or every entry when ticker is None"""
+        self._count("invalidations")
+        self.backend.invalidate(ticker)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend.name,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "coalesced": self.coalesced,
+                "invalidations": self.invalidations,
+                "errors": self.errors,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _make_backend():
+    if NEWS_CACHE_URL:
+        return RedisBackend(NEWS_CACHE_URL)
+    return MemoryBackend()
+
+
+news_cache = NewsResponseCache(_make_backend())
+
@@ -0,0 +1,262 @@
+"""
+news_dates rollup: (ticker, date, article_count, analyzed_count).
+
+The table is maintained by database triggers on news_articles and llm_news,
+so rows written by the crawler are counted as well as rows written by this
+app. Triggers are installed by migration 0005, or by create_all when they are
+missing (never replaced on boot: on Postgres that would lock the hot tables).
+`rebuild` recomputes the table from scratch, e.g. after a bulk
+load that bypassed the triggers:
+
+    python -m app.news_dates rebuild [--ticker AAPL]
+"""
+import argparse
+import logging
+from typing import List, Optional
+
+from sqlalchemy import delete, event, func, select, text
+from sqlalchemy.engine import Connection
+
+from app.database import Base
+from app.models import LLMNews, NewsArticle, NewsDate
+
+logger = logging.getLogger(__name__)
+
+POSTGRES_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION news_dates_bump(
+        p_ticker text, p_date date, p_articles integer, p_analyzed integer
+    ) RETURNS void AS $$
+    BEGIN
+        IF p_ticker IS NULL OR p_date IS NULL THEN
+            RETURN;
+        END IF;
+        INSERT INTO news_dates (ticker, date, article_count, analyzed_count, updated_at)
+        VALUES (p_ticker, p_date, p_articles, p_analyzed, now())
+        ON CONFLICT (ticker, date) DO UPDATE SET
+            article_count = news_dates.article_count + EXCLUDED.article_count,
+            analyzed_count = news_dates.analyzed_count + EXCLUDED.analyzed_count,
+            updated_at = EXCLUDED.updated_at;
+        DELETE FROM news_dates
+        WHERE ticker = p_ticker AND date = p_date AND article_count <= 0;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION news_dates_on_article() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE'
+            AND OLD.ticker IS NOT DISTINCT FROM NEW.ticker
+            AND OLD.date IS NOT DISTINCT FROM NEW.date THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM news_dates_bump(
+                OLD.ticker, OLD.date, -1,
+                -(SELECT count(*) FROM llm_news WHERE id = OLD.id)::integer
+            );
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM news_dates_bump(
+                NEW.ticker, NEW.date, 1,
+                (SELECT count(*) FROM llm_news WHERE id = NEW.id)::integer
+            );
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION news_dates_on_analysis() RETURNS trigger AS $$
+    DECLARE
+        article record;
+    BEGIN
+        SELECT ticker, date INTO article FROM news_articles
+        WHERE id = CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END;
+        IF FOUND THEN
+            PERFORM news_dates_bump(
+                article.ticker, article.date, 0,
+                CASE WHEN TG_OP = 'DELETE' THEN -1 ELSE 1 END
+            );
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS news_dates_article ON news_articles",
+    """
+    CREATE TRIGGER news_dates_article
+    AFTER INSERT OR DELETE OR UPDATE OF ticker, date ON news_articles
+    FOR EACH ROW EXECUTE FUNCTION news_dates_on_article()
+    """,
+    "DROP TRIGGER IF EXISTS news_dates_analysis ON llm_news",
+    """
+    CREATE TRIGGER news_dates_analysis
+    AFTER INSERT OR DELETE ON llm_news
+    FOR EACH ROW EXECUTE FUNCTION news_dates_on_analysis()
+    """,
+]
+
+# SQLite triggers cannot call functions, so each one spells out its updates
+_SQLITE_ADD = """
+    INSERT OR IGNORE INTO news_dates (ticker, date, article_count, analyzed_count, updated_at)
+    SELECT NEW.ticker, NEW.date, 0, 0, CURRENT_TIMESTAMP
+    WHERE NEW.ticker IS NOT NULL AND NEW.date IS NOT NULL;
+    UPDATE news_dates SET
+        article_count = article_count + 1,
+        analyzed_count = analyzed_count + (SELECT count(*) FROM llm_news WHERE id = NEW.id),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE ticker = NEW.ticker AND date = NEW.date;
+"""
+_SQLITE_REMOVE = """
+    UPDATE news_dates SET
+        article_count = article_count - 1,
+        analyzed_count = analyzed_count - (SELECT count(*) FROM llm_news WHERE id = OLD.id),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE ticker = OLD.ticker AND date = OLD.date;
+    DELETE FROM news_dates
+    WHERE ticker = OLD.ticker AND date = OLD.date AND article_count <= 0;
+"""
+_SQLITE_ANALYZED = """
+    UPDATE news_dates SET
+        analyzed_count = analyzed_count {sign} 1,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE (ticker, date) = (SELECT ticker, date FROM news_articles WHERE id = {row}.id);
+"""
+
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS news_dates_article_insert
+    AFTER INSERT ON news_articles
+    BEGIN {_SQLITE_ADD} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS news_dates_article_delete
+    AFTER DELETE ON news_articles
+    BEGIN {_SQLITE_REMOVE} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS news_dates_article_update
+    AFTER UPDATE OF ticker, date ON news_articles
+    WHEN OLD.ticker IS NOT NEW.ticker OR OLD.date IS NOT NEW.date
+    BEGIN {_SQLITE_REMOVE} {_SQLITE_ADD} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS news_dates_analysis_insert
+    AFTER INSERT ON llm_news
+    BEGIN {_SQLITE_ANALYZED.format(sign="+", row="NEW")} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS news_dates_analysis_delete
+    AFTER DELETE ON llm_news
+    BEGIN {_SQLITE_ANALYZED.format(sign="-", row="OLD")} END
+    """,
+]
+
+POSTGRES_TRIGGER_NAMES = ["news_dates_article", "news_dates_analysis"]
+
+SQLITE_TRIGGER_NAMES = [
+    "news_dates_article_insert",
+    "news_dates_article_delete",
+    "news_dates_article_update",
+    "news_dates_analysis_insert",
+    "news_dates_analysis_delete",
+]
+
+
+def trigger_statements(dialect: str) -> List[str]:
+    if dialect == "postgresql":
+        return POSTGRES_TRIGGERS
+    if dialect == "sqlite":
+        return SQLITE_TRIGGERS
+    logger.warning(f"news_dates triggers are not defined for {dialect}; run rebuild after loads")
+    return []
+
+
+def triggers_installed(conn: Connection) -> bool:
+    if conn.dialect.name == "postgresql":
+        names = conn.execute(
+            text(
+                "SELECT tgname FROM pg_trigger WHERE NOT tgisinternal "
+                "AND tgrelid IN ('news_articles'::regclass, 'llm_news'::regclass)"
+            )
+        ).scalars()
+        return set(POSTGRES_TRIGGER_NAMES) <= set(names)
+    if conn.dialect.name == "sqlite":
+        names = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        ).scalars()
+        return set(SQLITE_TRIGGER_NAMES) <= set(names)
+    return False
+
+
+def install_triggers(conn: Connection):
+    for statement in trigger_statements(conn.dialect.name):
+        conn.execute(text(statement))
+
+
+def drop_triggers(conn: Connection):
+    if conn.dialect.name == "postgresql":
+        for name, table in zip(POSTGRES_TRIGGER_NAMES, ("news_articles", "llm_news")):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name} ON {table}"))
+        for function in ("news_dates_on_article", "news_dates_on_analysis", "news_dates_bump"):
+            conn.execute(text(f"DROP FUNCTION IF EXISTS {function} CASCADE"))
+    else:
+        for name in SQLITE_TRIGGER_NAMES:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+
+
+def rebuild(conn: Connection, ticker: Optional[str] = None) -> int:
+    """Recomputes news_dates (for one ticker, or all) from the source tables"""
+    clear = delete(NewsDate)
+    counts = (
+        select(
+            NewsArticle.ticker,
+            NewsArticle.date,
+            func.count(NewsArticle.id),
+            func.count(LLMNews.id),
+            func.now(),
+        )
+        .outerjoin(LLMNews, NewsArticle.id == LLMNews.id)
+        .where(NewsArticle.ticker.is_not(None), NewsArticle.date.is_not(None))
+        .group_by(NewsArticle.ticker, NewsArticle.date)
+    )
+    if ticker is not None:
+        clear = clear.where(NewsDate.ticker == ticker)
+        counts = counts.where(NewsArticle.ticker == ticker)
+
+    conn.execute(clear)
+    result = conn.execute(
+        NewsDate.__table__.insert().from_select(
+            ["ticker", "date", "article_count", "analyzed_count", "updated_at"], counts
+        )
+    )
+    return result.rowcount
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_after_create(target, connection, tables=(), **kw):
+    if not triggers_installed(connection):
+        install_triggers(connection)
+    # news_dates was just created next to existing news: backfill it
+    if NewsDate.__table__ in tables:
+        rebuild(connection)
+
+
+def main():
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="news_dates rollup maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="recompute the rollup")
+    rebuild_parser.add_argument("--ticker", help="only this ticker")
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        rows = rebuild(conn, args.ticker)
+    logger.info(f"news_dates rebuilt: {rows} rows")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
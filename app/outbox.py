@@ -0,0 +1,201 @@
+"""
+Persistent email outbox.
+
+Mail is enqueued as email_outbox rows keyed by an idempotency key, and a pool
+of async workers drains due rows over persistent SMTP connections. Failed
+sends are retried with exponential backoff and end in the "dead" state after
+max_attempts.
+"""
+import asyncio
+import logging
+import os
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from fastapi_mail import ConnectionConfig
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal, dialect_insert
+from app.jobs import utcnow
+from app.metrics import outbox_emails_total
+from app.models import EmailOutbox
+from app.smtp_pool import SMTPSender, build_message
+
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "4"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_BACKOFF_BASE_SECONDS = int(os.getenv("OUTBOX_BACKOFF_BASE_SECONDS", "60"))
+OUTBOX_BACKOFF_MAX_SECONDS = int(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "3600"))
+OUTBOX_LOCK_SECONDS = int(os.getenv("OUTBOX_LOCK_SECONDS", "300"))
+OUTBOX_MESSAGES_PER_CONNECTION = int(os.getenv("OUTBOX_MESSAGES_PER_CONNECTION", "50"))
+
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_emails(db: AsyncSession, emails: Iterable[Dict]) -> int:
+    """
+    Adds emails ({idempotency_key, recipient, subject, body}) to the outbox in
+    one statement. Keys that are already queued are skipped. Returns the
+    number of new rows. The caller commits.
+    """
+    now = utcnow()
+    rows = [
+        {
+            "status": "pending",
+            "attempts": 0,
+            "max_attempts": OUTBOX_MAX_ATTEMPTS,
+            "next_attempt_at": now,
+            "created_at": now,
+            **email,
+        }
+        for email in emails
+    ]
+    if not rows:
+        return 0
+
+    result = await db.execute(
+        dialect_insert(db.bind, EmailOutbox)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["idempotency_key"])
+    )
+    return result.rowcount
+
+
+async def enqueue_email(
+    db: AsyncSession, idempotency_key: str, recipient: str, subject: str, body: str
+) -> bool:
+    """트랜잭션 메일 한 건을 outbox에 추가 (이미 있는 key면 무시)"""
+    added = await enqueue_emails(
+        db,
+        [
+            {
+                "idempotency_key": idempotency_key,
+                "recipient": recipient,
+                "subject": subject,
+                "body": body,
+            }
+        ],
+    )
+    return added == 1
+
+
+async def existing_keys(db: AsyncSession, keys: Iterable[str]) -> set:
+    keys = list(keys)
+    if not keys:
+        return set()
+    rows = await db.execute(
+        select(EmailOutbox.idempotency_key).where(EmailOutbox.idempotency_key.in_(keys))
+    )
+    return {row.idempotency_key for row in rows}
+
+
+def backoff_seconds(attempts: int) -> int:
+    return min(OUTBOX_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX_SECONDS)
+
+
+async def _claim_batch(limit: int) -> List[EmailOutbox]:
+    """
+    Marks up to `limit` due rows as sending. The claim is a single conditional
+    UPDATE ... RETURNING, so concurrent workers never get the same row.
+    """
+    now = utcnow()
+    due = or_(
+        and_(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now),
+        # claimed by a worker that died before finishing
+        and_(EmailOutbox.status == "sending", EmailOutbox.locked_until < now),
+    )
+    async with AsyncSessionLocal() as db:
+        candidates = (
+            select(EmailOutbox.id)
+            .where(due)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(limit)
+        )
+        if db.bind.dialect.name == "postgresql":
+            candidates = candidates.with_for_update(skip_locked=True)
+
+        result = await db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(candidates.scalar_subquery()), due)
+            .values(status="sending", locked_until=now + timedelta(seconds=OUTBOX_LOCK_SECONDS))
+            .returning(EmailOutbox)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.scalars().all()
+        await db.commit()
+        return rows
+
+
+async def _record_result(row: EmailOutbox, error: Exception | None) -> str:
+    now = utcnow()
+    attempts = row.attempts + 1
+    if error is None:
+        values = {"status": "sent", "sent_at": now, "last_error": None}
+    elif attempts >= row.max_attempts:
+        values = {"status": "dead", "last_error": str(error)}
+    else:
+        values = {
+            "status": "pending",
+            "next_attempt_at": now + timedelta(seconds=backoff_seconds(attempts)),
+            "last_error": str(error),
+        }
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == row.id)
+            .values(attempts=attempts, locked_until=None, **values)
+        )
+        await db.commit()
+    return values["status"]
+
+
+async def drain_outbox(
+    get_config: Callable[[], ConnectionConfig],
+    workers: int = OUTBOX_WORKERS,
+    batch_size: int = OUTBOX_BATCH_SIZE,
+) -> Dict[str, int]:
+    """
+    Sends every currently due outbox row with `workers` concurrent workers,
+    each holding one SMTP connection. Returns counts by resulting status.
+    The mail config is only built once a row was claimed, so an idle poll
+    costs one UPDATE and needs no MAIL_* settings.
+    """
+    counts = {"sent": 0, "pending": 0, "dead": 0}
+    first = await _claim_batch(batch_size)
+    if not first:
+        return counts
+    config = get_config()
+
+    async def worker(rows: Optional[List[EmailOutbox]]):
+        sender = SMTPSender(config, max_messages=OUTBOX_MESSAGES_PER_CONNECTION)
+        try:
+            if rows is None:
+                rows = await _claim_batch(batch_size)
+            while rows:
+                for row in rows:
+                    error = None
+                    try:
+                        await sender.send(
+                            build_message(config, row.recipient, row.subject, row.body)
+                        )
+                    except Exception as e:
+                        error = e
+
+                    status = await _record_result(row, error)
+                    counts[status] += 1
+                    outbox_emails_total.inc(status)
+                    if error is None:
+                        logger.info(f"Email sent successfully to {row.recipient}")
+                    else:
+                        logger.error(
+                            f"Failed to send email to {row.recipient} "
+                            f"(attempt {row.attempts + 1}, {status}): {str(error)}"
+                        )
+                rows = await _claim_batch(batch_size)
+        finally:
+            await sender.close()
+
+    await asyncio.gather(worker(first), *(worker(None) for _ in range(workers - 1)))
+    return counts
@@ -0,0 +1,136 @@
+"""
+Query-plan regression check for the hot news/newsletter/feed queries.
+
+Runs EXPLAIN for each query against DATABASE_URL and fails when a plan falls
+back to a full scan of the news tables, the feed tables or the interest
+tables. Run after migrations:
+
+    python -m app.query_plans
+"""
+import json
+import logging
+import sys
+from datetime import date
+from typing import Dict, List
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.feed import feed_page_query, stale_interests_query
+from app.llm import ticker_candidates_query
+from app.models import LLMNews, NewsArticle, NewsDate
+from app.routers.news import NEWS_VIEWS, news_batch_query
+
+logger = logging.getLogger(__name__)
+
+CHECKED_TABLES = {
+    "news_articles",
+    "llm_news",
+    "news_dates",
+    "user_feeds",
+    "user_feed_items",
+    "user_index_interest",
+    "user_stock_interest",
+}
+SAMPLE_TICKER = "AAPL"
+SAMPLE_DATE = date(2025, 1, 1)
+
+
+def hot_queries(dialect: str) -> Dict[str, object]:
+    """Statements mirroring app/routers/news.py, app/llm.py and app/feed.py."""
+    return {
+        "news_by_ticker": (
+            select(NewsArticle.id, NewsArticle.date, NewsArticle.title, LLMNews.summary)
+            .outerjoin(LLMNews, NewsArticle.id == LLMNews.id)
+            .where(NewsArticle.ticker == SAMPLE_TICKER)
+            .order_by(NewsArticle.date.desc(), NewsArticle.id.asc())
+            .limit(51)
+        ),
+        "news_by_ticker_and_date": (
+            select(NewsArticle.id, NewsArticle.title, LLMNews.summary)
+            .outerjoin(LLMNews, NewsArticle.id == LLMNews.id)
+            .where(NewsArticle.ticker == SAMPLE_TICKER, NewsArticle.date == SAMPLE_DATE)
+            .order_by(NewsArticle.id.asc())
+        ),
+        "available_dates": (
+            select(NewsDate.date, NewsDate.article_count, NewsDate.analyzed_count)
+            .where(NewsDate.ticker == SAMPLE_TICKER)
+            .order_by(NewsDate.date.desc())
+        ),
+        "newsletter_candidates": ticker_candidates_query(dialect, [SAMPLE_TICKER, "MSFT"]),
+        "user_feed_page": feed_page_query("sample-user", 20, 21),
+        "stale_feeds": stale_interests_query(),
+        "news_batch": news_batch_query(
+            dialect, NEWS_VIEWS["summary"], [SAMPLE_TICKER, "MSFT"], 20, SAMPLE_DATE
+        ),
+    }
+
+
+def _full_scans_postgres(conn: Connection, sql: str) -> List[str]:
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    found = []
+    stack = [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        node_type = node.get("Node Type")
+        if node.get("Relation Name") in CHECKED_TABLES:
+            # An index scan without an Index Cond walks the whole index
+            if node_type == "Seq Scan" or (
+                node_type in ("Index Scan", "Index Only Scan") and "Index Cond" not in node
+            ):
+                found.append(f"{node_type} on {node['Relation Name']}")
+        stack.extend(node.get("Plans", []))
+    return found
+
+
+def _full_scans_sqlite(conn: Connection, sql: str) -> List[str]:
+    found = []
+    for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"):
+        detail = row[-1]
+        # "SCAN <table>" (with or without USING INDEX) walks every row;
+        # a usable index shows up as "SEARCH <table> USING INDEX"
+        if detail.startswith("SCAN ") and detail.split()[1] in CHECKED_TABLES:
+            found.append(detail)
+    return found
+
+
+def check_query_plans(engine: Engine) -> Dict[str, List[str]]:
+    """Returns {query name: [full scans]} for every hot query."""
+    results = {}
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            # Small tables make seq scans cheapest; only flag missing indexes
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+            explain = _full_scans_postgres
+        elif engine.dialect.name == "sqlite":
+            explain = _full_scans_sqlite
+        else:
+            raise RuntimeError(f"Unsupported dialect: {engine.dialect.name}")
+
+        for name, stmt in hot_queries(engine.dialect.name).items():
+            sql = str(
+                stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+            )
+            results[name] = explain(conn, sql)
+    return results
+
+
+def main() -> int:
+    from app.database import engine
+
+    failed = False
+    for name, scans in check_query_plans(engine).items():
+        if scans:
+            failed = True
+            logger.error(f"{name}: {', '.join(scans)}")
+        else:
+            logger.info(f"{name}: ok")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import RedirectResponse
 import httpx
 import os
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt
-from app.database import get_db
+from app.auth import invalidate_user
+from app.database import get_async_db
 from app.models import User
 
 router = APIRouter()
@@ -15,7 +16,7 @@ FRONTEND_URL = os.getenv("FRONTEND_URL")
 
 
 @router.get("/auth/google/callback")
-async def google_callback(code: str, db: Session = Depends(get_db)):
+async def google_callback(code: str, db: AsyncSession = Depends(get_async_db)):
     data = {
         "client_id": os.getenv("GOOGLE_CLIENT_ID"),
         "client_secret": os.getenv("GOOGLE_CLIENT_SECRET"),
@@ -54,7 +55,7 @@ async def google_callback(code: str, db: Session = Depends(get_db)):
         algorithm=os.getenv("ALGORITHM"),
     )
 
-    user = db.query(User).filter_by(id=user_id).first()
+    user = await db.get(User, user_id)
 
     if user:
         redirect_url = f"{FRONTEND_URL}/main?token={token}"
@@ -63,7 +64,8 @@ async def google_callback(code: str, db: Session = Depends(get_db)):
             id=user_id, email=email, name=name, provider=provider, email_opt_in=False
         )
         db.add(new_user)
-        db.commit()
+        await db.commit()
+        invalidate_user(user_id)
 
         redirect_url = f"{FRONTEND_URL}/interest?token={token}"
 
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List
 from jose import jwt, JWTError
 import os
 
-from app.database import get_db
-from app.models import User, StockIndex, StockBATMMAAN
+from app.auth import invalidate_user
+from app.database import get_async_db
+from app.interests import add_interests, validate_interests
+from app.models import User
 
 router = APIRouter()
 
@@ -18,7 +22,7 @@ class RegisterRequest(BaseModel):
 
 
 @router.post("/auth/register-complete")
-def register_complete(payload: RegisterRequest, db: Session = Depends(get_db)):
+async def register_complete(payload: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     try:
         payload_data = jwt.decode(
             payload.token, os.getenv("SECRET_KEY"), algorithms=[os.getenv("ALGORITHM")]
@@ -31,29 +35,24 @@ def register_complete(payload: RegisterRequest, db: Session = Depends(get_db)):
     name = payload_data["name"]
     provider = payload_data["provider"]
 
-    if db.query(User).filter_by(id=user_id).first():
+    if await db.get(User, user_id) is not None:
         raise HTTPException(status_code=400, detail="이미 가입된 사용자입니다")
 
-    user = User(
-        id=user_id, email=email, name=name, provider=provider, email_opt_in=False
-    )
-    db.add(user)
+    selected = {"index": payload.selectedIndices, "stock": payload.selectedStocks}
+    await validate_interests(db, selected)
 
-    for ticker in payload.selectedIndices:
-        index = db.query(StockIndex).filter_by(Ticker=ticker).first()
-        if not index:
-            raise HTTPException(
-                status_code=400, detail=f"지수 {ticker}가 존재하지 않습니다"
-            )
-        user.interested_indices.append(index)
-
-    for ticker in payload.selectedStocks:
-        stock = db.query(StockBATMMAAN).filter_by(Ticker=ticker).first()
-        if not stock:
-            raise HTTPException(
-                status_code=400, detail=f"종목 {ticker}가 존재하지 않습니다"
+    try:
+        await db.execute(
+            insert(User).values(
+                id=user_id, email=email, name=name, provider=provider, email_opt_in=False
             )
-        user.interested_stocks.append(stock)
+        )
+        await add_interests(db, user_id, selected)
+        await db.commit()
+    except IntegrityError:
+        # a concurrent request registered the same user first
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="이미 가입된 사용자입니다")
 
-    db.commit()
+    invalidate_user(user_id)
     return {"msg": "회원가입이 완료되었습니다"}
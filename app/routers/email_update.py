@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models import User
-from app.auth import get_current_user
+from app.auth import CurrentUser, get_current_user, invalidate_user
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
@@ -14,23 +15,27 @@ class NewsletterSettingsRequest(BaseModel):
 @router.post("/newsletter", summary="뉴스 레터 구독 설정")
 async def set_email_update(
     request: NewsletterSettingsRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """뉴스레터 구독 설정을 업데이트합니다."""
-    current_user.email_opt_in = request.email_opt_in
-    db.commit()
-    db.refresh(current_user)
-    
+    await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(email_opt_in=request.email_opt_in)
+    )
+    await db.commit()
+    invalidate_user(current_user.id)
+
     return {
         "message": "뉴스 레터 구독 설정이 업데이트되었습니다.", 
-        "email_opt_in": current_user.email_opt_in, 
+        "email_opt_in": request.email_opt_in, 
         "email": current_user.email
     }
 
 
 @router.get("/newsletter", summary="뉴스 레터 구독 설정 조회")
-async def get_email_settings(current_user: User = Depends(get_current_user)):
+async def get_email_settings(current_user: CurrentUser = Depends(get_current_user)):
     """현재 뉴스레터 구독 설정을 조회합니다."""
     return {
         "email_opt_in": current_user.email_opt_in,
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+import hmac
+import os
+from app.cache import get_cache_stats
+from app.catalog import catalog
+from app.database import get_pool_stats
+from app.feed import refresh_stale_feeds
+from app.metrics import render_metrics
+from app.news_cache import news_cache
+from app.startup import startup_report
+
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+
+
+def verify_internal_token(x_internal_token: str | None = Header(None)):
+    """
+    X-Internal-Token 헤더를 INTERNAL_API_TOKEN과 비교합니다.
+    토큰이 설정되지 않은 환경에서는 모든 /internal 요청을 거부합니다.
+    """
+    if not INTERNAL_API_TOKEN or not x_internal_token or not hmac.compare_digest(
+        x_internal_token.encode(), INTERNAL_API_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
+
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    include_in_schema=False,
+    dependencies=[Depends(verify_internal_token)],
+)
+
+
+@router.get("/db-pool", summary="DB 커넥션 풀 상태 조회")
+def get_db_pool_stats():
+    return get_pool_stats()
+
+
+@router.get(
+    "/metrics", summary="Prometheus 형식 요청/작업 지표", response_class=PlainTextResponse
+)
+async def get_metrics():
+    # async: renders on the event loop thread, which is the only metrics writer
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get("/startup", summary="기동 단계별 소요 시간 조회")
+def get_startup_report():
+    return startup_report.as_dict()
+
+
+@router.get("/caches", summary="프로세스 내 캐시 통계 조회")
+def get_caches_stats():
+    return get_cache_stats()
+
+
+@router.post("/catalog/refresh", summary="티커 카탈로그 캐시 갱신")
+def refresh_catalog():
+    """
+    요청을 처리한 워커의 카탈로그만 즉시 갱신합니다.
+    다른 워커는 CATALOG_REFRESH_SECONDS 주기 갱신으로 반영됩니다.
+    """
+    return {"version": catalog.refresh(), "pid": os.getpid()}
+
+
+@router.post("/news-cache/invalidate", summary="뉴스 응답 캐시 비우기")
+def invalidate_news_cache(ticker: str | None = None):
+    """
+    캐시 키에 news_dates 상태가 포함되어 뉴스 적재 후 호출할 필요는 없으며,
+    메모리 확보용입니다 (메모리 백엔드는 요청을 처리한 워커만, ticker가 없으면 전체 삭제).
+    """
+    news_cache.invalidate(ticker)
+    return {"invalidated": ticker or "*"}
+
+
+@router.post("/feeds/refresh", summary="오래된 사용자 피드 즉시 갱신")
+async def refresh_feeds():
+    """크롤러가 분석 결과를 적재한 뒤 호출하면 주기 갱신을 기다리지 않음"""
+    return {"refreshed": await refresh_stale_feeds()}
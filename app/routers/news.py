@@ -1,27 +1,324 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, func, or_, select, true, union_all
+from sqlalchemy.dialects.postgresql import array
 from sqlalchemy.orm import Session
-from datetime import datetime
-from app.schemas import NewsResponse
-from app.models import NewsArticle, LLMNews
+from datetime import datetime, timedelta
+from typing import Literal
+from zoneinfo import ZoneInfo
+import base64
+import binascii
+import os
+from app.schemas import (
+    NewsArticleBody,
+    NewsBatchRequest,
+    NewsBatchResponse,
+    NewsDateCount,
+    NewsPage,
+    NewsResponse,
+    SparseNewsResponse,
+)
+from app.serialization import dump_rows, dumps, rows_as_dicts
+from app.models import NewsArticle, NewsDate, LLMNews
 from app.database import get_db
+from app.http_cache import IMMUTABLE_CACHE_CONTROL, ConditionalResponse, make_etag
+from app.news_cache import NewsCacheEntry, news_cache
 
 router = APIRouter(prefix="/news", tags=["News"])
 
+NEWS_PAGE_DEFAULT_LIMIT = 50
+NEWS_PAGE_MAX_LIMIT = 200
+NEWS_TIMEZONE = ZoneInfo(os.getenv("NEWS_TIMEZONE", "Asia/Seoul"))
+NEWS_CACHE_MAX_AGE = int(os.getenv("NEWS_CACHE_MAX_AGE", "60"))
+LIVE_CACHE_CONTROL = f"public, max-age={NEWS_CACHE_MAX_AGE}"
+# A date is only served as immutable this many days after it ends, so late
+# articles and crawler backfills still land before clients pin it
+NEWS_IMMUTABLE_AFTER_DAYS = int(os.getenv("NEWS_IMMUTABLE_AFTER_DAYS", "2"))
 
-@router.get("/dates/{ticker}", response_model=list[str])
-def get_available_dates(ticker: str, db: Session = Depends(get_db)):
-    result = (
-        db.query(NewsArticle.date)
-        .filter(NewsArticle.ticker == ticker)
-        .distinct()
-        .order_by(NewsArticle.date.desc())
-        .all()
+VIEW_DESCRIPTION = "full: 전체 필드, summary: 기사 본문(article) 제외"
+FIELDS_DESCRIPTION = "포함할 필드 (콤마 구분, id/date는 항상 포함). 지정하면 view보다 우선"
+
+
+# NewsResponse field -> column; rows are serialized as-is, so labels match
+NEWS_COLUMNS = {
+    "id": NewsArticle.id,
+    "ticker": NewsArticle.ticker,
+    "date": NewsArticle.date,
+    "title": NewsArticle.title,
+    "article": NewsArticle.article,
+    "real_url": NewsArticle.real_url,
+    "summary": LLMNews.summary,
+    "subject": LLMNews.subject,
+    "valence": LLMNews.valence,
+    "arousal": LLMNews.arousal,
+    "importance": LLMNews.importance,
+}
+NEWS_FIELDS = tuple(NewsResponse.model_fields)
+# Always returned: identify the row and carry the page cursor
+NEWS_KEY_FIELDS = ("id", "date")
+NEWS_VIEWS = {
+    "full": NEWS_FIELDS,
+    "summary": tuple(f for f in NEWS_FIELDS if f != "article"),
+}
+
+
+def resolve_fields(fields: str | None, view: str) -> tuple:
+    """fields(콤마 구분)가 있으면 우선, 없으면 view의 필드 목록 (스키마 순서)"""
+    if not fields:
+        return NEWS_VIEWS[view]
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(NEWS_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"알 수 없는 필드입니다: {', '.join(sorted(unknown))}",
+        )
+    requested.update(NEWS_KEY_FIELDS)
+    return tuple(f for f in NEWS_FIELDS if f in requested)
+
+
+def _news_columns(fields: tuple = NEWS_FIELDS):
+    """요청된 필드의 컬럼만 조회 (article 본문은 요청할 때만 읽음)"""
+    return [NEWS_COLUMNS[f] for f in fields]
+
+
+def _news_query(db: Session, fields: tuple):
+    query = db.query(*_news_columns(fields)).select_from(NewsArticle)
+    # LEFT JOIN llm_news only when an analysis field is requested
+    if any(NEWS_COLUMNS[f].class_ is LLMNews for f in fields):
+        query = query.outerjoin(LLMNews, NewsArticle.id == LLMNews.id)
+    return query
+
+
+def _news_select(fields: tuple):
+    """_news_query as a Core select, for statements built outside a Session"""
+    stmt = select(*_news_columns(fields)).select_from(NewsArticle)
+    if any(NEWS_COLUMNS[f].class_ is LLMNews for f in fields):
+        stmt = stmt.outerjoin(LLMNews, NewsArticle.id == LLMNews.id)
+    return stmt
+
+
+def news_batch_query(
+    dialect: str, fields: tuple, tickers: list, limit: int, date_from=None, date_to=None
+):
+    """
+    Newest `limit` articles per ticker (date desc, id asc), each read as one
+    range scan of ix_news_articles_ticker_date_id that stops after `limit`
+    rows: LATERAL over the ticker list on Postgres, a UNION ALL of per-ticker
+    LIMIT subqueries elsewhere. Rows carry the ticker as `_ticker`.
+    """
+
+    def latest(ticker):
+        stmt = _news_select(fields).add_columns(NewsArticle.ticker.label("_ticker"))
+        stmt = stmt.where(NewsArticle.ticker == ticker)
+        if date_from:
+            stmt = stmt.where(NewsArticle.date >= date_from)
+        if date_to:
+            stmt = stmt.where(NewsArticle.date <= date_to)
+        return stmt.order_by(NewsArticle.date.desc(), NewsArticle.id.asc()).limit(limit)
+
+    if dialect == "postgresql":
+        wanted = func.unnest(array(tickers)).table_valued("ticker").render_derived("wanted")
+        rows = latest(wanted.c.ticker).lateral("latest")
+        stmt = select(rows).select_from(wanted).join(rows, true())
+    else:
+        rows = union_all(*(select(latest(t).subquery()) for t in tickers)).subquery()
+        stmt = select(rows)
+    return stmt.order_by(rows.c._ticker, rows.c.date.desc(), rows.c.id.asc())
+
+
+def encode_cursor(date, article_id: str) -> str:
+    raw = f"{date.isoformat()}|{article_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        date_str, article_id = raw.split("|", 1)
+        return datetime.strptime(date_str, "%Y-%m-%d").date(), article_id
+    except (ValueError, UnicodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="유효하지 않은 cursor 입니다.")
+
+
+def _rollup_validators(db: Session, ticker: str, *filters) -> tuple:
+    """
+    (article_count, analyzed_count, last_modified, etag parts) for the
+    ticker's news_dates rows matching `filters`: the ETag covers the row
+    count, the article/analysis totals and the newest update, which the
+    triggers bump on every article or analysis write. Reads the small
+    rollup instead of aggregating the ticker's whole article history.
+    """
+    row = (
+        db.query(
+            func.count(),
+            func.coalesce(func.sum(NewsDate.article_count), 0),
+            func.coalesce(func.sum(NewsDate.analyzed_count), 0),
+            func.max(NewsDate.updated_at),
+        )
+        .filter(NewsDate.ticker == ticker, *filters)
+        .one()
+    )
+    _, article_count, analyzed_count, updated_at = row
+    return article_count, analyzed_count, updated_at, tuple(row)
+
+
+def _cached_news(
+    request: Request,
+    db: Session,
+    ticker: str,
+    key: str,
+    body_fn,
+    validators: tuple,
+    immutable_if_past=None,
+) -> Response:
+    """
+    Serves body_fn() with its HTTP validators. The ETag covers the ticker's
+    news_dates state and doubles as the news cache key, so a write to the
+    ticker's news changes the key: nothing needs invalidating, in any
+    worker. A settled past date (older than NEWS_IMMUTABLE_AFTER_DAYS) that
+    has articles, all of them analyzed, is served as immutable; an empty
+    date may still be backfilled.
+    """
+    article_count, analyzed_count, last_modified, parts = validators
+    seed = "|".join(str(part) for part in (ticker, key, *parts))
+    etag = make_etag(seed.encode("utf-8"))
+
+    cache_control = LIVE_CACHE_CONTROL
+    settled_before = datetime.now(NEWS_TIMEZONE).date() - timedelta(
+        days=NEWS_IMMUTABLE_AFTER_DAYS
+    )
+    if (
+        immutable_if_past is not None
+        and immutable_if_past <= settled_before
+        and article_count > 0
+        and article_count == analyzed_count
+    ):
+        cache_control = IMMUTABLE_CACHE_CONTROL
+
+    conditional = ConditionalResponse(request, etag, last_modified, cache_control)
+    if (not_modified := conditional.not_modified()) is not None:
+        return not_modified
+
+    # End the validators' transaction: a request waiting on another one's
+    # load must not hold a pooled connection; only the loader checks one out
+    db.rollback()
+    entry = news_cache.get_or_load(
+        ticker,
+        etag,
+        lambda: NewsCacheEntry(
+            body=body_fn(),
+            etag=etag,
+            last_modified=last_modified,
+            cache_control=cache_control,
+        ),
+    )
+    response = Response(entry.body, media_type="application/json")
+    conditional.apply(response)
+    return response
+
+
+@router.get("/dates/{ticker}", response_model=list[str] | list[NewsDateCount])
+def get_available_dates(
+    ticker: str,
+    request: Request,
+    with_counts: bool = Query(False, description="날짜별 기사/분석 건수 포함 여부"),
+    db: Session = Depends(get_db),
+):
+    """
+    티커의 뉴스가 있는 날짜를 최신순으로 반환합니다 (news_dates 집계 테이블 조회).
+    - with_counts=true 이면 날짜별 article_count, analyzed_count 포함
+    """
+
+    def body():
+        if not with_counts:
+            result = (
+                db.query(NewsDate.date)
+                .filter(NewsDate.ticker == ticker)
+                .order_by(NewsDate.date.desc())
+            )
+            return dumps([r.date for r in result])
+        result = (
+            db.query(NewsDate.date, NewsDate.article_count, NewsDate.analyzed_count)
+            .filter(NewsDate.ticker == ticker)
+            .order_by(NewsDate.date.desc())
+        )
+        return dump_rows(result)
+
+    key = "dates:counts" if with_counts else "dates"
+    return _cached_news(request, db, ticker, key, body, _rollup_validators(db, ticker))
+
+
+@router.post("/batch", response_model=NewsBatchResponse)
+def get_news_batch(batch: NewsBatchRequest, db: Session = Depends(get_db)):
+    """
+    여러 티커의 뉴스를 한 번의 쿼리로 조회하여 티커별로 묶어 반환합니다.
+    - 티커마다 최신순(date desc, id asc) 최대 limit_per_ticker건
+    - date_from/date_to로 기간 제한 (양 끝 포함)
+    - fields 또는 view로 선택한 필드만 응답에 포함 (기본 summary)
+    """
+    if batch.date_from and batch.date_to and batch.date_from > batch.date_to:
+        raise HTTPException(
+            status_code=400, detail="date_from은 date_to보다 늦을 수 없습니다."
+        )
+    selected = resolve_fields(
+        ",".join(batch.fields) if batch.fields else None, batch.view
+    )
+    tickers = list(dict.fromkeys(batch.tickers))
+
+    rows = db.execute(
+        news_batch_query(
+            db.bind.dialect.name,
+            selected,
+            tickers,
+            batch.limit_per_ticker,
+            batch.date_from,
+            batch.date_to,
+        )
     )
-    return [r.date.isoformat() for r in result]
 
+    results = {ticker: [] for ticker in tickers}
+    for row in rows:
+        results[row._ticker].append({f: row._mapping[f] for f in selected})
+    return Response(dumps({"results": results}), media_type="application/json")
 
-@router.get("/{ticker}/{date}", response_model=list[NewsResponse])
-def get_news_by_ticker_and_date(ticker: str, date: str, db: Session = Depends(get_db)):
+
+@router.get("/article/{article_id}", response_model=NewsArticleBody)
+def get_news_article(article_id: str, request: Request, db: Session = Depends(get_db)):
+    """기사 본문만 조회 (목록 API는 view=summary로 본문 없이 받고 필요할 때 호출)"""
+    row = (
+        db.query(NewsArticle.id, NewsArticle.article, NewsArticle.created_at)
+        .filter(NewsArticle.id == article_id)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="기사를 찾을 수 없습니다.")
+
+    body = dumps({"id": row.id, "article": row.article})
+    conditional = ConditionalResponse(
+        request, make_etag(body), row.created_at, LIVE_CACHE_CONTROL
+    )
+    if (not_modified := conditional.not_modified()) is not None:
+        return not_modified
+    response = Response(body, media_type="application/json")
+    conditional.apply(response)
+    return response
+
+
+@router.get("/{ticker}/{date}", response_model=list[SparseNewsResponse])
+def get_news_by_ticker_and_date(
+    ticker: str,
+    date: str,
+    request: Request,
+    view: Literal["full", "summary"] = Query("full", description=VIEW_DESCRIPTION),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db),
+):
+    """
+    티커/날짜별 뉴스를 반환합니다.
+    - fields 또는 view로 선택한 필드만 응답에 포함 (나머지 키는 생략)
+    """
+    selected = resolve_fields(fields, view)
     try:
         parsed_date = datetime.strptime(date, "%Y-%m-%d").date()
     except ValueError:
@@ -29,64 +326,75 @@ def get_news_by_ticker_and_date(ticker: str, date: str, db: Session = Depends(ge
             status_code=400, detail="날짜 형식은 YYYY-MM-DD 이어야 합니다."
         )
 
-    # Use LEFT JOIN to get both article and LLM data in one query
-    results = (
-        db.query(NewsArticle, LLMNews)
-        .outerjoin(LLMNews, NewsArticle.id == LLMNews.id)        .filter(NewsArticle.ticker == ticker, NewsArticle.date == parsed_date)
-        .order_by(NewsArticle.id.asc())
-        .all()
-    )
-
-    responses = []
-    for article, llm in results:
-        # Only LLM has summary, article doesn't have summary field
-        summary = llm.summary if llm else None
-        
-        response = NewsResponse(
-            id=article.id,
-            ticker=article.ticker,
-            date=article.date,
-            title=article.title,
-            article=article.article,
-            real_url=article.real_url,
-            summary=summary,
-            subject=llm.subject if llm else None,
-            valence=llm.valence if llm else None,
-            arousal=llm.arousal if llm else None,
-            importance=llm.importance if llm else None,
+    def body():
+        results = (
+            _news_query(db, selected)
+            .filter(NewsArticle.ticker == ticker, NewsArticle.date == parsed_date)
+            .order_by(NewsArticle.id.asc())
+            .all()
         )
-        responses.append(response)
-    return responses
-
-
-@router.get("/{ticker}", response_model=list[NewsResponse])
-def get_news_by_ticker(ticker: str, db: Session = Depends(get_db)):
-    # Use LEFT JOIN to get both article and LLM data in one query
-    results = (
-        db.query(NewsArticle, LLMNews)
-        .outerjoin(LLMNews, NewsArticle.id == LLMNews.id)        .filter(NewsArticle.ticker == ticker)
-        .order_by(NewsArticle.date.desc(), NewsArticle.id.asc())
-        .all()
+        return dump_rows(results)
+
+    key = f"date:{parsed_date.isoformat()}:{','.join(selected)}"
+    return _cached_news(
+        request,
+        db,
+        ticker,
+        key,
+        body,
+        _rollup_validators(db, ticker, NewsDate.date == parsed_date),
+        immutable_if_past=parsed_date,
     )
 
-    responses = []
-    for article, llm in results:
-        # Only LLM has summary, article doesn't have summary field
-        summary = llm.summary if llm else None
-        
-        response = NewsResponse(
-            id=article.id,
-            ticker=article.ticker,
-            date=article.date,
-            title=article.title,
-            article=article.article,
-            real_url=article.real_url,
-            summary=summary,
-            subject=llm.subject if llm else None,
-            valence=llm.valence if llm else None,
-            arousal=llm.arousal if llm else None,
-            importance=llm.importance if llm else None,
+
+@router.get("/{ticker}", response_model=NewsPage)
+def get_news_by_ticker(
+    ticker: str,
+    request: Request,
+    limit: int = Query(NEWS_PAGE_DEFAULT_LIMIT, ge=1, le=NEWS_PAGE_MAX_LIMIT),
+    cursor: str | None = Query(None, description="이전 응답의 next_cursor"),
+    view: Literal["full", "summary"] = Query("full", description=VIEW_DESCRIPTION),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    include_article: bool = Query(
+        True, description="false이면 view=summary와 동일", deprecated=True
+    ),
+    db: Session = Depends(get_db),
+):
+    """
+    티커별 뉴스를 (date desc, id asc) 순서의 keyset 페이지로 반환합니다.
+    - 다음 페이지는 응답의 next_cursor 값을 cursor로 전달하여 조회
+    - fields 또는 view로 선택한 필드만 응답에 포함 (나머지 키는 생략)
+    """
+    if not include_article:
+        view = "summary"
+    selected = resolve_fields(fields, view)
+    after = decode_cursor(cursor) if cursor else None
+
+    def body():
+        query = _news_query(db, selected).filter(NewsArticle.ticker == ticker)
+
+        if after:
+            cursor_date, cursor_id = after
+            query = query.filter(
+                or_(
+                    NewsArticle.date < cursor_date,
+                    and_(NewsArticle.date == cursor_date, NewsArticle.id > cursor_id),
+                )
+            )
+
+        # Fetch one extra row to know whether another page exists
+        rows = (
+            query.order_by(NewsArticle.date.desc(), NewsArticle.id.asc())
+            .limit(limit + 1)
+            .all()
         )
-        responses.append(response)
 
-    return responses
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+
+        return dumps({"items": rows_as_dicts(rows), "next_cursor": next_cursor})
+
+    key = f"page:{limit}:{cursor or ''}:{','.join(selected)}"
+    return _cached_news(request, db, ticker, key, body, _rollup_validators(db, ticker))
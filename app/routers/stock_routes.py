@@ -1,18 +1,14 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import StockIndex, StockBATMMAAN
+from fastapi import APIRouter, Request
+from app.catalog import catalog
 
 router = APIRouter(prefix="/stock", tags=["Stock"])
 
 
 @router.get("/index-names", summary="지수 이름 목록 조회")
-def get_index_names(db: Session = Depends(get_db)):
-    indices = db.query(StockIndex).all()
-    return [{"ticker": index.Ticker, "name": index.Name} for index in indices]
+async def get_index_names(request: Request):
+    return await catalog.response("index-names", request)
 
 
 @router.get("/batmmaan-names", summary="BATMMAAN 종목 이름 목록 조회")
-def get_stock_names(db: Session = Depends(get_db)):
-    stocks = db.query(StockBATMMAAN).all()
-    return [{"ticker": stock.Ticker, "name": stock.Name} for stock in stocks]
+async def get_stock_names(request: Request):
+    return await catalog.response("batmmaan-names", request)
@@ -1,16 +1,11 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import StockIndex, StockBATMMAAN
-from fastapi.encoders import jsonable_encoder
+from fastapi import APIRouter, Query, Request
+from app.catalog import catalog
 
 router = APIRouter()
 
 
 @router.get("/tickers")
-def get_tickers(
-    type: str = Query(..., pattern="^(index|stock)$"), db: Session = Depends(get_db)
-):
+async def get_tickers(request: Request, type: str = Query(..., pattern="^(index|stock)$")):
     """
     사용자의 관심 종목 목록을 제공하는 API
     - 'type=index' → stock_index 테이블에서 모든 인덱스 종목 조회
@@ -25,12 +20,7 @@ def get_tickers(
             { "Ticker": "AAPL", "Name": "Apple", "query": "Apple stock market" },
             ...
         ]
-    """
-    if type == "index":
-        results = db.query(StockIndex).all()
-    elif type == "stock":
-        results = db.query(StockBATMMAAN).all()
-    else:
-        return []
 
-    return jsonable_encoder(results)
+    응답은 프로세스 내 카탈로그 캐시에서 제공되며 ETag / If-None-Match(304)를 지원합니다.
+    """
+    return await catalog.response(f"tickers:{type}", request)
@@ -1,12 +1,38 @@
-from fastapi import APIRouter, Depends
-from app.models import User
-from app.auth import get_current_user
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth import CurrentUser, get_current_user
+from app.database import get_async_db
+from app.feed import (
+    feed_page_query,
+    mark_feed_stale,
+    refresh_user_feed,
+    refresh_user_feed_task,
+)
+from app.interests import get_interests, replace_interests, validate_interests
+from app.http_cache import ConditionalResponse, make_etag
+from app.models import UserFeed
+from app.schemas import FeedPage, InterestsRequest, InterestsResponse
+from app.serialization import dumps, rows_as_dicts
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+FEED_PAGE_DEFAULT_LIMIT = 20
+FEED_PAGE_MAX_LIMIT = 100
+# per-user content: browsers may keep it but must revalidate with the ETag
+FEED_CACHE_CONTROL = "private, no-cache"
+
 
 @router.get("/profile", summary="사용자 프로필 조회")
-async def get_user_profile(current_user: User = Depends(get_current_user)):
+async def get_user_profile(current_user: CurrentUser = Depends(get_current_user)):
     """현재 로그인한 사용자의 프로필 정보를 반환합니다."""
     return {
         "id": current_user.id,
@@ -14,4 +40,96 @@ async def get_user_profile(current_user: User = Depends(get_current_user)):
         "name": current_user.name,
         "email_opt_in": current_user.email_opt_in,
         "provider": current_user.provider
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/feed", response_model=FeedPage, summary="개인화 뉴스 피드 조회")
+async def get_user_feed(
+    request: Request,
+    limit: int = Query(FEED_PAGE_DEFAULT_LIMIT, ge=1, le=FEED_PAGE_MAX_LIMIT),
+    cursor: int | None = Query(None, ge=0, description="이전 페이지의 next_cursor"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    관심 종목 기반으로 미리 계산된 피드를 순위 순으로 반환합니다.
+    피드는 새 분석이 적재되거나 관심 종목이 바뀌면 백그라운드에서 갱신됩니다.
+    """
+    feed = await db.get(UserFeed, current_user.id)
+    if feed is None:
+        # first visit: build it now, later reads are lookups
+        feed = await refresh_user_feed(db, current_user.id) or await db.get(
+            UserFeed, current_user.id
+        )
+
+    conditional = ConditionalResponse(
+        request,
+        etag=make_etag(f"{current_user.id}|{feed.refreshed_at}|{cursor}|{limit}".encode()),
+        last_modified=feed.refreshed_at,
+        cache_control=FEED_CACHE_CONTROL,
+    )
+    if (not_modified := conditional.not_modified()) is not None:
+        return not_modified
+
+    rows = (await db.execute(feed_page_query(current_user.id, cursor, limit + 1))).all()
+    items = rows_as_dicts(rows[:limit])
+    body = {
+        "items": items,
+        "next_cursor": items[-1]["position"] if len(rows) > limit else None,
+        "refreshed_at": feed.refreshed_at,
+    }
+    response = Response(content=dumps(body), media_type="application/json")
+    conditional.apply(response)
+    return response
+
+
+@router.get(
+    "/interests",
+    response_model=InterestsResponse,
+    response_model_exclude_none=True,
+    summary="관심 지수/종목 조회",
+)
+async def get_user_interests(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    interests = await get_interests(db, current_user.id)
+    return {
+        "selectedIndices": sorted(interests["index"]),
+        "selectedStocks": sorted(interests["stock"]),
+    }
+
+
+@router.put("/interests", response_model=InterestsResponse, summary="관심 지수/종목 변경")
+async def update_user_interests(
+    payload: InterestsRequest,
+    background_tasks: BackgroundTasks,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    관심 지수/종목 목록 전체를 받아 기존 목록과의 차이만 추가/삭제합니다.
+    변경이 있으면 응답 후 백그라운드에서 개인화 피드를 다시 계산합니다.
+    """
+    selected = {"index": payload.selectedIndices, "stock": payload.selectedStocks}
+    await validate_interests(db, selected)
+    try:
+        changes = await replace_interests(db, current_user.id, selected)
+        changed = any(changes["added"].values()) or any(changes["removed"].values())
+        if changed:
+            await mark_feed_stale(db, current_user.id)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=409, detail="관심 종목이 동시에 변경되었습니다. 다시 시도해 주세요."
+        )
+
+    if changed:
+        background_tasks.add_task(refresh_user_feed_task, current_user.id)
+
+    return {
+        "selectedIndices": sorted(set(payload.selectedIndices)),
+        "selectedStocks": sorted(set(payload.selectedStocks)),
+        **changes,
+    }
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
-from datetime import date
-from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Literal, Optional
 
 
 class LLMAnalysis(BaseModel):
@@ -15,10 +15,95 @@ class NewsResponse(BaseModel):
     ticker: str
     date: date
     title: str
-    article: str
+    article: str | None = None
     real_url: str
     summary: str | None = None
     subject: str | None = None
     valence: str | None = None
     arousal: str | None = None
     importance: str | None = None
+
+
+class SparseNewsResponse(BaseModel):
+    """
+    fields / view로 고른 필드만 담긴 NewsResponse.
+    id와 date만 항상 포함되고, 선택하지 않은 필드는 키 자체가 생략됩니다.
+    """
+
+    id: str
+    ticker: str | None = None
+    date: date
+    title: str | None = None
+    article: str | None = None
+    real_url: str | None = None
+    summary: str | None = None
+    subject: str | None = None
+    valence: str | None = None
+    arousal: str | None = None
+    importance: str | None = None
+
+
+class NewsArticleBody(BaseModel):
+    id: str
+    article: str | None = None
+
+
+class NewsPage(BaseModel):
+    items: list[SparseNewsResponse]
+    next_cursor: str | None = None
+
+
+class FeedItem(BaseModel):
+    position: int
+    id: str
+    ticker: str
+    date: date
+    title: str
+    real_url: str
+    summary: str | None = None
+    subject: str | None = None
+    valence: str | None = None
+    arousal: str | None = None
+    importance: str | None = None
+
+
+class FeedPage(BaseModel):
+    items: list[FeedItem]
+    next_cursor: int | None = None
+    refreshed_at: datetime | None = None
+
+
+class InterestsRequest(BaseModel):
+    selectedIndices: list[str] = Field(default_factory=list)
+    selectedStocks: list[str] = Field(default_factory=list)
+
+
+class InterestChanges(BaseModel):
+    index: list[str] = []
+    stock: list[str] = []
+
+
+class InterestsResponse(BaseModel):
+    selectedIndices: list[str]
+    selectedStocks: list[str]
+    added: InterestChanges | None = None
+    removed: InterestChanges | None = None
+
+
+class NewsDateCount(BaseModel):
+    date: date
+    article_count: int
+    analyzed_count: int
+
+
+class NewsBatchRequest(BaseModel):
+    tickers: list[str] = Field(min_length=1, max_length=50)
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    limit_per_ticker: int = Field(20, ge=1, le=200)
+    view: Literal["full", "summary"] = "summary"
+    fields: Optional[list[str]] = None
+
+
+class NewsBatchResponse(BaseModel):
+    results: dict[str, list[SparseNewsResponse]]
@@ -0,0 +1,118 @@
+"""
+Catalog seeding from app/data/*.json.
+
+Each seed file is hashed and compared with the hash recorded in seed_state.
+Unchanged files cost one small SELECT. A changed file is applied as a
+single bulk upsert keyed by Ticker, and its new hash is recorded in the same
+transaction. Run on startup via app.startup.prepare_database, or by hand:
+
+    python -m app.seed [--force]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
+
+from app.database import dialect_insert
+from app.jobs import utcnow
+from app.models import SeedState, StockBATMMAAN, StockIndex
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+# seed name -> (model, file)
+SEED_FILES = {
+    "stock_index": (StockIndex, "stock_index.json"),
+    "stock_batmmaan": (StockBATMMAAN, "stock_BATMMAAN.json"),
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _upsert(conn: Connection, model, rows) -> None:
+    stmt = dialect_insert(conn, model)
+    conn.execute(
+        stmt.values(rows).on_conflict_do_update(
+            index_elements=["Ticker"],
+            set_={"Name": stmt.excluded.Name, "query": stmt.excluded.query},
+        )
+    )
+
+
+def seed_catalog(engine: Engine, force: bool = False) -> Dict[str, Optional[int]]:
+    """
+    Applies every changed seed file. Returns seed name -> upserted rows, or
+    None when the file was unchanged (or missing) and skipped.
+    """
+    contents = {}
+    for name, (_, filename) in SEED_FILES.items():
+        path = os.path.join(DATA_DIR, filename)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                contents[name] = f.read()
+
+    results: Dict[str, Optional[int]] = {name: None for name in SEED_FILES}
+    with engine.begin() as conn:
+        applied = dict(
+            conn.execute(select(SeedState.name, SeedState.content_hash)).all()
+        )
+
+        for name, content in contents.items():
+            content_hash = hashlib.sha256(content).hexdigest()
+            if not force and applied.get(name) == content_hash:
+                continue
+
+            model, _ = SEED_FILES[name]
+            rows = [
+                {
+                    "Ticker": item["Ticker"],
+                    "Name": item["Name"],
+                    "query": item.get("query", ""),
+                }
+                for item in json.loads(content)
+            ]
+            if rows:
+                _upsert(conn, model, rows)
+
+            stmt = dialect_insert(conn, SeedState)
+            state = {
+                "content_hash": content_hash,
+                "row_count": len(rows),
+                "applied_at": utcnow(),
+            }
+            conn.execute(
+                stmt.values(name=name, **state).on_conflict_do_update(
+                    index_elements=["name"], set_=state
+                )
+            )
+            results[name] = len(rows)
+            logger.info(f"Seeded {name}: {len(rows)} rows")
+    return results
+
+
+def main():
+    from app.database import Base, engine
+
+    parser = argparse.ArgumentParser(description="Seed catalog tables from app/data")
+    parser.add_argument("--force", action="store_true", help="apply even if unchanged")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine, tables=[SeedState.__table__])
+    results = seed_catalog(engine, force=args.force)
+    if all(rows is None for rows in results.values()):
+        logger.info("Seed files unchanged; nothing to do")
+    else:
+        # A separate process: running servers reload their own catalog
+        logger.info(
+            "Running servers pick this up within CATALOG_REFRESH_SECONDS "
+            "(or per worker on POST /internal/catalog/refresh)"
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,24 @@
+"""
+JSON fast path for list endpoints.
+
+Column-projected rows are encoded straight to bytes with orjson instead of
+building a pydantic model per row and letting FastAPI validate and encode it
+again. Callers select columns labelled and ordered like the response schema
+(see app.schemas); orjson writes dates as ISO-8601, as pydantic does, so the
+documented shape is unchanged.
+"""
+from typing import Any, Iterable, List
+
+import orjson
+
+
+def dumps(data: Any) -> bytes:
+    return orjson.dumps(data)
+
+
+def rows_as_dicts(rows: Iterable) -> List[dict]:
+    return [row._asdict() for row in rows]
+
+
+def dump_rows(rows: Iterable) -> bytes:
+    return orjson.dumps([row._asdict() for row in rows])
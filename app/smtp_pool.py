@@ -0,0 +1,77 @@
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Optional
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
+
+
+def build_message(
+    config: ConnectionConfig, recipient: str, subject: str, html_body: str
+) -> EmailMessage:
+    """HTML 본문 메일 메시지 생성"""
+    message = EmailMessage()
+    message["Subject"] = subject
+    if config.MAIL_FROM_NAME:
+        message["From"] = formataddr((config.MAIL_FROM_NAME, config.MAIL_FROM))
+    else:
+        message["From"] = config.MAIL_FROM
+    message["To"] = recipient
+    message.set_content(html_body, subtype="html")
+    return message
+
+
+class SMTPSender:
+    """
+    Keeps one authenticated SMTP connection open and sends several messages
+    over it, reconnecting after max_messages or when the server drops it.
+    """
+
+    def __init__(self, config: ConnectionConfig, max_messages: int = 50):
+        self.config = config
+        self.max_messages = max_messages
+        self._client: Optional[aiosmtplib.SMTP] = None
+        self._sent = 0
+
+    async def _connect(self):
+        await self.close()
+        client = aiosmtplib.SMTP(
+            hostname=self.config.MAIL_SERVER,
+            port=self.config.MAIL_PORT,
+            timeout=self.config.TIMEOUT,
+            use_tls=self.config.MAIL_SSL_TLS,
+            start_tls=self.config.MAIL_STARTTLS,
+            validate_certs=self.config.VALIDATE_CERTS,
+        )
+        await client.connect()
+        if self.config.USE_CREDENTIALS:
+            await client.login(
+                self.config.MAIL_USERNAME, self.config.MAIL_PASSWORD.get_secret_value()
+            )
+        self._client = client
+        self._sent = 0
+
+    async def send(self, message: EmailMessage):
+        if (
+            self._client is None
+            or not self._client.is_connected
+            or self._sent >= self.max_messages
+        ):
+            await self._connect()
+
+        try:
+            await self._client.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # Idle connections get dropped by the server; retry once on a new one
+            await self._connect()
+            await self._client.send_message(message)
+        self._sent += 1
+
+    async def close(self):
+        client, self._client = self._client, None
+        if client is not None and client.is_connected:
+            try:
+                await client.quit()
+            except aiosmtplib.SMTPException:
+                client.close()
+
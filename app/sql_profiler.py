@@ -0,0 +1,204 @@
+"""
+SQL statement profiler.
+
+Engine event hooks (installed on both engines in app/database.py) attribute
+every statement to the current QueryProfile: one per HTTP request
+(SQLProfilerMiddleware) or per background job run (`profiled("newsletter")`).
+Statements outside either are not counted. For each profile it:
+
+- counts statements and DB time, logged for slow requests and jobs and, with
+  SQL_PROFILE_HEADERS, returned as X-DB-Queries / X-DB-Time-Ms /
+  X-DB-Max-Repeats response headers
+- logs statements slower than SQL_SLOW_QUERY_MS with their bound-parameter
+  shape (types only, never values)
+- warns once per shape when a request runs the same statement shape more
+  than SQL_N_PLUS_ONE_THRESHOLD times, the usual sign of a query in a
+  loop; with SQL_N_PLUS_ONE_RAISE (for tests) the statement fails instead.
+  Jobs that work in batches repeat statements by design and are not checked.
+
+A statement's shape is its SQL with IN-lists collapsed, so `IN (?, ?)` and
+`IN (?, ?, ?)` count as the same statement.
+"""
+import functools
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQL_PROFILE = os.getenv("SQL_PROFILE", "true").lower() == "true"
+SQL_PROFILE_HEADERS = os.getenv("SQL_PROFILE_HEADERS", "false").lower() == "true"
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+SQL_SLOW_REQUEST_MS = float(os.getenv("SQL_SLOW_REQUEST_MS", "1000"))
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+SQL_N_PLUS_ONE_RAISE = os.getenv("SQL_N_PLUS_ONE_RAISE", "false").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+# IN (?, ?, ...) / IN ($1, $2, ...) / IN (%(p_1)s, ...) -> IN (...)
+_PARAM = r"(?:\?|\$\d+|%\(\w+\)s|%s|:\w+)"
+_PARAM_LIST = re.compile(rf"\(\s*{_PARAM}(?:\s*,\s*{_PARAM})+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NPlusOneError(RuntimeError):
+    """SQL_N_PLUS_ONE_RAISE: a statement shape repeated past the threshold"""
+
+
+def statement_shape(statement: str) -> str:
+    return _PARAM_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def parameter_shape(parameters, executemany: bool) -> str:
+    """Types of the bound parameters, e.g. "(str, int)" or "500 x {id: str}" """
+
+    def one(params) -> str:
+        if isinstance(params, dict):
+            return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+        if isinstance(params, (list, tuple)):
+            return "(" + ", ".join(type(v).__name__ for v in params) + ")"
+        return type(params).__name__
+
+    if executemany and parameters:
+        return f"{len(parameters)} x {one(parameters[0])}"
+    return one(parameters) if parameters else "()"
+
+
+class QueryProfile:
+    def __init__(self, name: str, n_plus_one_threshold: Optional[int] = SQL_N_PLUS_ONE_THRESHOLD):
+        self.name = name
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.shapes: Dict[str, int] = {}
+        self.flagged: set = set()
+
+    @property
+    def max_repeats(self) -> int:
+        return max(self.shapes.values(), default=0)
+
+    def record(self, statement: str, parameters, executemany: bool, seconds: float):
+        self.queries += 1
+        self.db_seconds += seconds
+        shape = statement_shape(statement)
+        repeats = self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+        if seconds * 1000 >= SQL_SLOW_QUERY_MS:
+            logger.warning(
+                f"Slow query ({seconds * 1000:.1f}ms) in {self.name}: {shape} "
+                f"params={parameter_shape(parameters, executemany)}"
+            )
+        threshold = self.n_plus_one_threshold
+        if threshold is not None and repeats > threshold and shape not in self.flagged:
+            self.flagged.add(shape)
+            message = f"Possible N+1 in {self.name}: statement repeated {repeats} times: {shape}"
+            if SQL_N_PLUS_ONE_RAISE:
+                raise NPlusOneError(message)
+            logger.warning(message)
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "X-DB-Queries": str(self.queries),
+            "X-DB-Time-Ms": f"{self.db_seconds * 1000:.1f}",
+            "X-DB-Max-Repeats": str(self.max_repeats),
+        }
+
+    def log_summary(self, elapsed: float):
+        if elapsed * 1000 >= SQL_SLOW_REQUEST_MS:
+            logger.info(
+                f"{self.name}: {elapsed * 1000:.1f}ms, {self.queries} queries, "
+                f"{self.db_seconds * 1000:.1f}ms in DB"
+            )
+
+
+_current: ContextVar[Optional[QueryProfile]] = ContextVar("sql_profile", default=None)
+
+
+def current_profile() -> Optional[QueryProfile]:
+    return _current.get()
+
+
+@contextmanager
+def profiled(name: str, n_plus_one_threshold: Optional[int] = SQL_N_PLUS_ONE_THRESHOLD):
+    """
+    Attributes statements run inside the block (and tasks it starts) to
+    `name`. Pass n_plus_one_threshold=None to skip the repeat check.
+    """
+    profile = QueryProfile(name, n_plus_one_threshold)
+    token = _current.set(profile)
+    started = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+        profile.log_summary(time.perf_counter() - started)
+
+
+def profiled_job(name: str):
+    """Decorator for async jobs: one profile per run, without the repeat check"""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with profiled(name, n_plus_one_threshold=None):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    started = getattr(context, "_profile_started", None)
+    if profile is None or started is None:
+        return
+    profile.record(statement, parameters, executemany, time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine):
+    """Installs the profiling hooks on a (sync, or AsyncEngine.sync_engine) engine"""
+    if not SQL_PROFILE:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLProfilerMiddleware:
+    """
+    ASGI middleware opening one QueryProfile per HTTP request. Sync routes
+    run in the threadpool with a copy of the request context, so their
+    statements are attributed too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not SQL_PROFILE:
+            await self.app(scope, receive, send)
+            return
+
+        with profiled(f"{scope['method']} {scope['path']}") as profile:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start" and SQL_PROFILE_HEADERS:
+                    headers = list(message.get("headers", []))
+                    headers.extend(
+                        (name.lower().encode("latin-1"), value.encode("latin-1"))
+                        for name, value in profile.headers().items()
+                    )
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,111 @@
+"""
+Explicit startup phases and a cold-start timing report.
+
+Importing the app does no I/O. The lifespan runs these phases, and each one
+is timed into `startup_report`:
+
+- database: schema per STARTUP_DDL, then catalog seeding (STARTUP_SEED),
+  then a readiness ping
+    - migrate (default): alembic upgrade head
+    - create_all: Base.metadata.create_all on an empty database, stamped at
+      the alembic head; refused on an existing one, whose new columns only
+      migrations add
+    - skip: nothing; production runs migrations as a separate step
+- catalog: load the in-process ticker catalog
+- jobs: schedule the newsletter, outbox, feed refresh and metrics flush loops
+
+The report is logged once startup completes and served at /internal/startup.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# main.py imports this module first, so this marks the start of app imports
+IMPORT_STARTED = time.perf_counter()
+
+STARTUP_DDL = os.getenv("STARTUP_DDL", "migrate").lower()
+STARTUP_SEED = os.getenv("STARTUP_SEED", "true").lower() == "true"
+DDL_MODES = ("migrate", "create_all", "skip")
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    def __init__(self):
+        self.phases: List[Dict] = []
+        self.completed_at: Optional[float] = None
+
+    def record(self, name: str, seconds: float, **details):
+        self.phases.append({"phase": name, "ms": round(seconds * 1000, 1), **details})
+
+    @contextmanager
+    def phase(self, name: str, **details):
+        started = time.perf_counter()
+        try:
+            yield details
+        finally:
+            self.record(name, time.perf_counter() - started, **details)
+
+    def complete(self):
+        self.completed_at = time.time()
+        summary = ", ".join(f"{p['phase']} {p['ms']}ms" for p in self.phases)
+        logger.info(f"Startup: {summary} (total {self.total_ms()}ms)")
+
+    def total_ms(self) -> float:
+        return round(sum(p["ms"] for p in self.phases), 1)
+
+    def as_dict(self) -> dict:
+        return {
+            "phases": self.phases,
+            "total_ms": self.total_ms(),
+            "completed_at": self.completed_at,
+        }
+
+
+startup_report = StartupReport()
+
+
+def alembic_config():
+    """The project's alembic config, usable from any working directory"""
+    from alembic.config import Config
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(root, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(root, "migrations"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def _migrate():
+    from alembic import command
+
+    command.upgrade(alembic_config(), "head")
+
+
+def prepare_database(ddl: str = STARTUP_DDL, seed: bool = STARTUP_SEED) -> dict:
+    """Brings the schema up per `ddl`, seeds the catalog and pings the DB"""
+    from sqlalchemy import text
+
+    from app.database import engine
+
+    if ddl not in DDL_MODES:
+        raise ValueError(f"STARTUP_DDL must be one of {', '.join(DDL_MODES)}: {ddl}")
+
+    details = {"ddl": ddl, "seed": seed}
+    if ddl == "create_all":
+        from app.create_tables import create_tables
+
+        create_tables()
+    elif ddl == "migrate":
+        _migrate()
+
+    if seed:
+        from app.seed import seed_catalog
+
+        details["seeded"] = seed_catalog(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return details
@@ -0,0 +1,170 @@
+"""
+Synthetic benchmark data: users with interests, news articles and their
+LLM analyses for every catalog ticker.
+
+Rows come from a seeded random.Random, so the same Volumes always produce
+the same database, and are written with bulk Core inserts (the news_dates
+triggers and generated score columns fill in as they do for the crawler).
+Import after DATABASE_URL points at the benchmark database.
+"""
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+
+from app.models import (
+    LLMNews,
+    NewsArticle,
+    StockBATMMAAN,
+    StockIndex,
+    User,
+    user_index_interest,
+    user_stock_interest,
+)
+
+# Articles are dated backwards from here, so runs do not depend on today
+END_DATE = date(2025, 6, 30)
+INSERT_CHUNK_SIZE = 1000
+ID_PREFIX = "bench"
+
+
+@dataclass
+class Volumes:
+    users: int = 200
+    stock_interests: int = 3
+    index_interests: int = 1
+    articles_per_ticker: int = 300
+    analyzed_ratio: float = 0.8
+    days: int = 60
+    seed: int = 42
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class Dataset:
+    """What the load scenarios sample request parameters from"""
+
+    stock_tickers: List[str]
+    index_tickers: List[str]
+    user_ids: List[str]
+    article_ids: List[str]
+    dates: List[date]
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def tickers(self) -> List[str]:
+        return self.stock_tickers + self.index_tickers
+
+
+def _catalog(engine: Engine):
+    with engine.connect() as conn:
+        stocks = conn.execute(select(StockBATMMAAN.Ticker).order_by(StockBATMMAAN.Ticker))
+        indices = conn.execute(select(StockIndex.Ticker).order_by(StockIndex.Ticker))
+        return [r.Ticker for r in stocks], [r.Ticker for r in indices]
+
+
+def _score(rng: random.Random) -> str | None:
+    roll = rng.random()
+    if roll < 0.03:
+        return None
+    if roll < 0.05:
+        return "N/A"  # the LLM sometimes answers with text
+    return f"{rng.random():.2f}"
+
+
+def _insert_chunked(conn, table, rows: List[dict]):
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        conn.execute(insert(table), rows[start:start + INSERT_CHUNK_SIZE])
+
+
+def generate(engine: Engine, volumes: Volumes) -> Dataset:
+    """Inserts the synthetic rows into an empty (catalog-seeded) database"""
+    rng = random.Random(volumes.seed)
+    stock_tickers, index_tickers = _catalog(engine)
+    if not stock_tickers:
+        raise RuntimeError("The catalog is empty; seed it first (python -m app.seed)")
+    dates = [END_DATE - timedelta(days=n) for n in range(volumes.days)]
+
+    articles, analyses = [], []
+    for ticker in stock_tickers + index_tickers:
+        for n in range(volumes.articles_per_ticker):
+            article_id = f"{ID_PREFIX}-{ticker}-{n:06}"
+            articles.append(
+                {
+                    "id": article_id,
+                    "ticker": ticker,
+                    "date": dates[n % volumes.days],
+                    "title": f"{ticker} 헤드라인 {n}",
+                    "article": "본문 " * rng.randint(200, 1200),
+                    "real_url": f"https://example.com/{ticker}/{n}",
+                }
+            )
+            if rng.random() < volumes.analyzed_ratio:
+                analyses.append(
+                    {
+                        "id": article_id,
+                        "subject": rng.choice(["실적", "인수합병", "규제", "신제품", "거시경제"]),
+                        "valence": _score(rng),
+                        "arousal": _score(rng),
+                        "importance": _score(rng),
+                        "summary": "요약 " * rng.randint(40, 250),
+                    }
+                )
+
+    users, stock_interests, index_interests = [], [], []
+    for n in range(volumes.users):
+        user_id = f"{ID_PREFIX}-user-{n:06}"
+        users.append(
+            {
+                "id": user_id,
+                "email": f"{user_id}@example.com",
+                "name": f"사용자 {n}",
+                "provider": "google",
+                "email_opt_in": rng.random() < 0.5,
+            }
+        )
+        for ticker in rng.sample(stock_tickers, min(volumes.stock_interests, len(stock_tickers))):
+            stock_interests.append({"user_id": user_id, "ticker": ticker})
+        for ticker in rng.sample(index_tickers, min(volumes.index_interests, len(index_tickers))):
+            index_interests.append({"user_id": user_id, "ticker": ticker})
+
+    with engine.begin() as conn:
+        _insert_chunked(conn, NewsArticle.__table__, articles)
+        _insert_chunked(conn, LLMNews.__table__, analyses)
+        _insert_chunked(conn, User.__table__, users)
+        _insert_chunked(conn, user_stock_interest, stock_interests)
+        _insert_chunked(conn, user_index_interest, index_interests)
+
+    return describe(engine)
+
+
+def describe(engine: Engine) -> Dataset:
+    """Reads back the synthetic rows of an already generated database"""
+    stock_tickers, index_tickers = _catalog(engine)
+    prefix = f"{ID_PREFIX}-%"
+    with engine.connect() as conn:
+        user_ids = conn.execute(
+            select(User.id).where(User.id.like(prefix)).order_by(User.id)
+        ).scalars().all()
+        article_ids = conn.execute(
+            select(LLMNews.id).where(LLMNews.id.like(prefix)).order_by(LLMNews.id)
+        ).scalars().all()
+        dates = conn.execute(
+            select(NewsArticle.date).distinct().order_by(NewsArticle.date.desc())
+        ).scalars().all()
+        counts = {
+            "users": len(user_ids),
+            "articles": conn.execute(select(func.count()).select_from(NewsArticle)).scalar(),
+            "analyses": conn.execute(select(func.count()).select_from(LLMNews)).scalar(),
+        }
+    return Dataset(stock_tickers, index_tickers, list(user_ids), list(article_ids), list(dates), counts)
+
+
+def has_news(engine: Engine) -> bool:
+    with engine.connect() as conn:
+        return conn.execute(select(NewsArticle.id).limit(1)).first() is not None
@@ -0,0 +1,349 @@
+"""
+HTTP load benchmark: seeds a database with synthetic data (benchmarks.data)
+and drives the ASGI app in-process over httpx, reporting per-endpoint
+latency percentiles and throughput as JSON.
+
+    python -m benchmarks.load [--database-url sqlite:///bench.db]
+        [--users 200] [--articles-per-ticker 300] [--requests 200]
+        [--concurrency 8] [--scenarios news_page,users_feed] [--cold]
+        [--output report.json] [--baseline old.json --max-regression 0.2]
+
+The default database is a SQLite file in the temp directory; pass a local
+Postgres URL to benchmark Postgres. A database that already has news is
+only used with --reuse (benchmark it as is) or --reset (drop and recreate
+every table). Request parameters are drawn from a seeded RNG, so runs with
+the same options send the same requests. The lifespan is not run: schema,
+catalog and feeds are prepared up front and no background jobs start.
+
+With --baseline, scenarios whose p95 grew by more than --max-regression
+(a fraction) are listed under "regressions" and the exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # (dataset, rng) -> (path, json body)
+    build: Callable[..., Tuple[str, Optional[dict]]]
+    authenticated: bool = False
+
+
+def _get(path_fn):
+    return lambda d, rng: (path_fn(d, rng), None)
+
+
+SCENARIOS = [
+    Scenario("news_page", "GET", _get(lambda d, r: f"/news/{r.choice(d.tickers)}?limit=50")),
+    Scenario(
+        "news_page_summary",
+        "GET",
+        _get(lambda d, r: f"/news/{r.choice(d.tickers)}?limit=50&view=summary"),
+    ),
+    Scenario(
+        "news_by_date",
+        "GET",
+        _get(lambda d, r: f"/news/{r.choice(d.tickers)}/{r.choice(d.dates).isoformat()}"),
+    ),
+    Scenario(
+        "news_dates",
+        "GET",
+        _get(lambda d, r: f"/news/dates/{r.choice(d.tickers)}?with_counts=true"),
+    ),
+    Scenario("news_article", "GET", _get(lambda d, r: f"/news/article/{r.choice(d.article_ids)}")),
+    Scenario(
+        "news_batch",
+        "POST",
+        lambda d, r: (
+            "/news/batch",
+            {"tickers": r.sample(d.tickers, min(5, len(d.tickers))), "limit_per_ticker": 20},
+        ),
+    ),
+    Scenario("tickers", "GET", _get(lambda d, r: f"/tickers?type={r.choice(['index', 'stock'])}")),
+    Scenario("stock_index_names", "GET", _get(lambda d, r: "/stock/index-names")),
+    Scenario("stock_batmmaan_names", "GET", _get(lambda d, r: "/stock/batmmaan-names")),
+    Scenario("users_profile", "GET", _get(lambda d, r: "/users/profile"), authenticated=True),
+    Scenario("users_feed", "GET", _get(lambda d, r: "/users/feed?limit=20"), authenticated=True),
+    Scenario("users_interests", "GET", _get(lambda d, r: "/users/interests"), authenticated=True),
+    Scenario(
+        "settings_newsletter", "GET", _get(lambda d, r: "/settings/newsletter"), authenticated=True
+    ),
+    # Writes last, so the read scenarios above see the generated data
+    Scenario(
+        "users_interests_update",
+        "PUT",
+        lambda d, r: (
+            "/users/interests",
+            {
+                "selectedIndices": r.sample(d.index_tickers, min(1, len(d.index_tickers))),
+                "selectedStocks": r.sample(d.stock_tickers, min(3, len(d.stock_tickers))),
+            },
+        ),
+        authenticated=True,
+    ),
+]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], statuses: Counter, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+
+    def ms(seconds: float) -> float:
+        return round(seconds * 1000, 3)
+
+    errors = sum(n for status, n in statuses.items() if status >= 400)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "status": {str(status): n for status, n in sorted(statuses.items())},
+        "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": ms(percentile(ordered, 0.50)),
+            "p95": ms(percentile(ordered, 0.95)),
+            "p99": ms(percentile(ordered, 0.99)),
+            "mean": ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+            "max": ms(ordered[-1]) if ordered else 0.0,
+        },
+    }
+
+
+async def run_scenario(client, scenario: Scenario, requests: List[tuple], concurrency: int) -> dict:
+    """Sends `requests` ((path, body, headers)) with `concurrency` workers"""
+    pending = list(reversed(requests))
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+
+    async def worker():
+        while pending:
+            path, body, headers = pending.pop()
+            started = time.perf_counter()
+            response = await client.request(scenario.method, path, json=body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+def build_requests(scenario: Scenario, dataset, rng: random.Random, count: int, tokens) -> list:
+    requests = []
+    for _ in range(count):
+        path, body = scenario.build(dataset, rng)
+        headers = {}
+        if scenario.authenticated:
+            headers["Authorization"] = f"Bearer {rng.choice(tokens)}"
+        requests.append((path, body, headers))
+    return requests
+
+
+def make_tokens(user_ids: List[str]) -> List[str]:
+    from jose import jwt
+
+    return [
+        jwt.encode(
+            {"sub": f"{user_id}@example.com", "id": user_id, "name": user_id, "provider": "google"},
+            os.environ["SECRET_KEY"],
+            algorithm=os.environ["ALGORITHM"],
+        )
+        for user_id in user_ids
+    ]
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> List[dict]:
+    """Scenarios whose p95 grew by more than max_regression relative to baseline"""
+    regressions = []
+    for name, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or not before["latency_ms"]["p95"]:
+            continue
+        change = result["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1
+        if change > max_regression:
+            regressions.append(
+                {
+                    "scenario": name,
+                    "baseline_p95_ms": before["latency_ms"]["p95"],
+                    "p95_ms": result["latency_ms"]["p95"],
+                    "change": round(change, 3),
+                }
+            )
+    return regressions
+
+
+def prepare(args) -> Tuple[object, dict]:
+    """Schema, catalog, synthetic data and feeds; returns (dataset, timings)"""
+    from app.database import Base, engine
+    from app.startup import prepare_database
+    from benchmarks.data import Volumes, describe, generate, has_news
+
+    timings = {}
+    started = time.perf_counter()
+    if args.reset:
+        Base.metadata.drop_all(engine)
+    prepare_database(ddl="create_all", seed=True)
+    timings["schema_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    started = time.perf_counter()
+    if has_news(engine):
+        if not args.reuse:
+            sys.exit(
+                f"{engine.url.render_as_string()} already has news; "
+                "pass --reuse to benchmark it as is or --reset to recreate it"
+            )
+        dataset = describe(engine)
+    else:
+        volumes = Volumes(
+            users=args.users,
+            stock_interests=args.stock_interests,
+            index_interests=args.index_interests,
+            articles_per_ticker=args.articles_per_ticker,
+            analyzed_ratio=args.analyzed_ratio,
+            days=args.days,
+            seed=args.seed,
+        )
+        dataset = generate(engine, volumes)
+    timings["data_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return dataset, timings
+
+
+async def benchmark(args) -> dict:
+    import httpx
+
+    import main
+    from app.catalog import catalog
+    from app.feed import refresh_stale_feeds
+
+    dataset, timings = prepare(args)
+    if not dataset.user_ids and any(s.authenticated for s in args.selected):
+        sys.exit("No synthetic users to authenticate as; generate with --users > 0")
+
+    started = time.perf_counter()
+    catalog.refresh()
+    await refresh_stale_feeds(include_missing=True)
+    timings["warm_state_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    rng = random.Random(args.seed)
+    tokens = make_tokens(dataset.user_ids)
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for scenario in args.selected:
+            if args.warmup:
+                warmup = build_requests(scenario, dataset, rng, args.warmup, tokens)
+                await run_scenario(client, scenario, warmup, args.concurrency)
+            requests = build_requests(scenario, dataset, rng, args.requests, tokens)
+            results[scenario.name] = await run_scenario(
+                client, scenario, requests, args.concurrency
+            )
+
+    from app.database import engine
+
+    return {
+        "config": {
+            "database": engine.dialect.name,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "cold": args.cold,
+            "seed": args.seed,
+            "dataset": dataset.counts,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "setup": timings,
+        "scenarios": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="In-process HTTP load benchmark")
+    parser.add_argument(
+        "--database-url",
+        default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'fastapi-backend-bench.db')}",
+    )
+    data = parser.add_mutually_exclusive_group()
+    data.add_argument("--reset", action="store_true", help="drop and recreate every table")
+    data.add_argument("--reuse", action="store_true", help="benchmark existing data as is")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--stock-interests", type=int, default=3)
+    parser.add_argument("--index-interests", type=int, default=1)
+    parser.add_argument("--articles-per-ticker", type=int, default=300)
+    parser.add_argument("--analyzed-ratio", type=float, default=0.8)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests first")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", help="comma-separated names (default: all)")
+    parser.add_argument("--cold", action="store_true", help="disable the news response cache")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier report to compare p95 against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    by_name: Dict[str, Scenario] = {s.name: s for s in SCENARIOS}
+    names = args.scenarios.split(",") if args.scenarios else list(by_name)
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (have: {', '.join(by_name)})")
+    args.selected = [by_name[name] for name in names]
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    # The app reads its configuration at import time
+    # (set, not removed: load_dotenv never overrides an existing variable)
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["ASYNC_DATABASE_URL"] = ""
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ["SQL_PROFILE_HEADERS"] = "false"
+    if args.cold:
+        os.environ["NEWS_CACHE_TTL"] = "0"
+        os.environ["NEWS_CACHE_URL"] = ""
+    logging.basicConfig(level=logging.WARNING)
+
+    report = asyncio.run(benchmark(args))
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(report, json.load(f), args.max_regression)
+        status = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Serialization cost of the news list endpoints, per 1k articles.
+
+Compares the old path (a NewsResponse per row, then FastAPI's response_model
+validation and jsonable_encoder + json.dumps) with the row -> orjson fast
+path used by app/routers/news.py. Rows come from an in-memory SQLite
+database, so only serialization is timed:
+
+    python -m benchmarks.serialization [--articles 1000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models import LLMNews, NewsArticle  # noqa: E402
+from app.routers.news import _news_columns  # noqa: E402
+from app.schemas import NewsResponse  # noqa: E402
+from app.serialization import dump_rows  # noqa: E402
+
+
+def load_rows(articles: int):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        for i in range(articles):
+            article_id = f"bench-{i:06}"
+            db.add(
+                NewsArticle(
+                    id=article_id,
+                    ticker="AAPL",
+                    date=date(2025, 1, 1) + timedelta(days=i % 30),
+                    title=f"헤드라인 {i}",
+                    article="본문 " * 300,
+                    real_url=f"https://example.com/{i}",
+                )
+            )
+            db.add(
+                LLMNews(
+                    id=article_id,
+                    subject="실적",
+                    valence="0.42",
+                    arousal="0.17",
+                    importance=str(i % 10 / 10),
+                    summary="요약 " * 60,
+                )
+            )
+        db.commit()
+        return (
+            db.query(*_news_columns())
+            .outerjoin(LLMNews, NewsArticle.id == LLMNews.id)
+            .order_by(NewsArticle.id)
+            .all()
+        )
+
+
+_adapter = TypeAdapter(list[NewsResponse])
+
+
+def pydantic_path(rows) -> bytes:
+    # What the routes did before: build models, then FastAPI validates the
+    # return value against response_model and encodes it again
+    items = [NewsResponse(**row._mapping) for row in rows]
+    validated = _adapter.validate_python(items)
+    content = jsonable_encoder(_adapter.dump_python(validated, mode="json"))
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_path(rows) -> bytes:
+    return dump_rows(rows)
+
+
+def timed(fn, rows, repeat: int) -> float:
+    """Best-of-`repeat` seconds for one call"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = load_rows(args.articles)
+    assert json.loads(pydantic_path(rows)) == json.loads(fast_path(rows))
+
+    per_k = 1000 / args.articles
+    before = timed(pydantic_path, rows, args.repeat) * per_k
+    after = timed(fast_path, rows, args.repeat) * per_k
+    print(f"articles: {args.articles}, best of {args.repeat}")
+    print(f"pydantic + response_model: {before * 1000:8.2f} ms / 1k articles")
+    print(f"orjson rows:               {after * 1000:8.2f} ms / 1k articles")
+    print(f"speedup:                   {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
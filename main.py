@@ -1,3 +1,4 @@
+from app.startup import IMPORT_STARTED, prepare_database, startup_report
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,25 +10,51 @@ from app.routers.email_update import router as email_update_router
 from app.routers.users import router as users_router
 from app.routers import tickers
 from app.routers.news import router as news_router
-from app.mail import send_newsletter
+from app.routers.internal import router as internal_router
+from app.mail import send_newsletter, process_outbox, resume_newsletter
+from app.feed import process_feeds
+from app.metrics import METRICS_DIR, MetricsMiddleware, flush_metrics
+from app.sql_profiler import SQLProfilerMiddleware
+from app.catalog import catalog, process_catalog_refresh
 
-import app.create_tables
 import asyncio
 import logging
+import time
 logging.basicConfig(level=logging.INFO)
 
+startup_report.record("import", time.perf_counter() - IMPORT_STARTED)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # DDL / seeding / readiness per STARTUP_DDL and STARTUP_SEED (app/startup.py)
+    with startup_report.phase("database") as details:
+        details.update(await asyncio.to_thread(prepare_database))
+
+    with startup_report.phase("catalog"):
+        await asyncio.to_thread(catalog.refresh)
+
     async def run_newsletter():
         try:
             await send_newsletter()
         except Exception as e:
             logging.error(f"Newsletter error: {e}")
 
-    asyncio.create_task(run_newsletter())  # doesn't block startup
+    with startup_report.phase("jobs"):
+        asyncio.create_task(run_newsletter())  # doesn't block startup
+        await resume_newsletter()  # takes over a run a crashed node left behind
+        await process_outbox()  # schedules the periodic outbox drain
+        await process_feeds()  # schedules the stale feed sweep
+        await process_catalog_refresh()  # keeps this worker's catalog in sync
+        if METRICS_DIR:
+            await flush_metrics()  # shares this worker's metrics with the others
+
+    startup_report.complete()
     yield
 
 
+_routers_started = time.perf_counter()
+
 app = FastAPI(lifespan=lifespan)
 
 
@@ -43,6 +70,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(SQLProfilerMiddleware)
+# outermost, so latency covers the whole middleware stack
+app.add_middleware(MetricsMiddleware)
 
 
 app.include_router(google_router)
@@ -51,4 +81,7 @@ app.include_router(stock_router)
 app.include_router(tickers.router)
 app.include_router(news_router)
 app.include_router(email_update_router)
-app.include_router(users_router)
\ No newline at end of file
+app.include_router(users_router)
+app.include_router(internal_router)
+
+startup_report.record("routers", time.perf_counter() - _routers_started)
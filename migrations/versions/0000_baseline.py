@@ -0,0 +1,105 @@
+"""baseline schema
+
+Revision ID: 0000
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+Tables as they existed before migrations were introduced. Every table is
+created with if_not_exists, and later revisions skip columns that already
+exist, so an unversioned database built by create_all is brought to head by
+`alembic upgrade head`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0000"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("email", sa.String()),
+        sa.Column("name", sa.String()),
+        sa.Column("provider", sa.String()),
+        sa.Column("email_opt_in", sa.Boolean()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_users_id", "users", ["id"], if_not_exists=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True, if_not_exists=True)
+
+    for table in ("stock_index", "stock_batmmaan"):
+        op.create_table(
+            table,
+            sa.Column("Ticker", sa.String(), primary_key=True),
+            sa.Column("Name", sa.String()),
+            sa.Column("query", sa.String()),
+            if_not_exists=True,
+        )
+
+    op.create_table(
+        "user_index_interest",
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column(
+            "ticker", sa.String(), sa.ForeignKey("stock_index.Ticker"), primary_key=True
+        ),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "user_stock_interest",
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column(
+            "ticker", sa.String(), sa.ForeignKey("stock_batmmaan.Ticker"), primary_key=True
+        ),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "news_articles",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("ticker", sa.String()),
+        sa.Column("date", sa.Date()),
+        sa.Column("title", sa.String()),
+        sa.Column("article", sa.Text()),
+        sa.Column("real_url", sa.String()),
+        sa.UniqueConstraint("real_url", "title", name="uq_realurl_title"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "seen_links",
+        sa.Column("rss_url", sa.String(), primary_key=True),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "llm_news",
+        sa.Column("id", sa.String(), sa.ForeignKey("news_articles.id"), primary_key=True),
+        sa.Column("subject", sa.String()),
+        sa.Column("valence", sa.String()),
+        sa.Column("arousal", sa.String()),
+        sa.Column("importance", sa.String()),
+        sa.Column("summary", sa.Text()),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in (
+        "llm_news",
+        "seen_links",
+        "news_articles",
+        "user_stock_interest",
+        "user_index_interest",
+        "stock_batmmaan",
+        "stock_index",
+        "users",
+    ):
+        op.drop_table(table)
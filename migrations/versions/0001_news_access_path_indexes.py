@@ -0,0 +1,41 @@
+"""news access path indexes
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = "0000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tables created by Base.metadata.create_all already carry these indexes.
+    op.create_index(
+        "ix_news_articles_ticker_date_id",
+        "news_articles",
+        ["ticker", sa.text("date DESC"), "id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_news_articles_ticker_id",
+        "news_articles",
+        ["ticker", "id"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_news_articles_ticker_id", table_name="news_articles")
+    op.drop_index("ix_news_articles_ticker_date_id", table_name="news_articles")
@@ -0,0 +1,46 @@
+"""job run leases and checkpoints
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "job_runs",
+        sa.Column("job_name", sa.String(), primary_key=True),
+        sa.Column("run_key", sa.String(), primary_key=True),
+        sa.Column("owner", sa.String()),
+        sa.Column("status", sa.String()),
+        sa.Column("lease_expires_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "job_run_items",
+        sa.Column("job_name", sa.String(), primary_key=True),
+        sa.Column("run_key", sa.String(), primary_key=True),
+        sa.Column("item_key", sa.String(), primary_key=True),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("job_run_items")
+    op.drop_table("job_runs")
@@ -0,0 +1,72 @@
+"""news_articles.created_at for HTTP validators
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.news_dates import drop_triggers, install_triggers, triggers_installed
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    # Unversioned create_all databases may already have it; offline SQL assumes not
+    if op.get_context().as_sql:
+        return False
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _restore_desc_index() -> None:
+    # Table recreation reflects ix_news_articles_ticker_date_id without DESC
+    if op.get_bind().dialect.name == "sqlite":
+        op.drop_index("ix_news_articles_ticker_date_id", table_name="news_articles")
+        op.create_index(
+            "ix_news_articles_ticker_date_id",
+            "news_articles",
+            ["ticker", sa.text("date DESC"), "id"],
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _has_column("news_articles", "created_at"):
+        return
+    column = sa.Column(
+        "created_at",
+        sa.DateTime(timezone=True),
+        server_default=sa.func.now(),
+    )
+    # SQLite cannot ADD COLUMN with a non-constant default, so recreate there;
+    # other backends run a plain ALTER TABLE (no copy, keeps the llm_news FK)
+    if op.get_bind().dialect.name != "sqlite":
+        op.add_column("news_articles", column)
+        return
+    # news_dates triggers (installed by create_all on unversioned databases)
+    # reference news_articles, which SQLite rejects while it is recreated
+    bind = op.get_bind()
+    triggers = triggers_installed(bind)
+    if triggers:
+        drop_triggers(bind)
+    with op.batch_alter_table("news_articles", recreate="always") as batch_op:
+        batch_op.add_column(column)
+    _restore_desc_index()
+    if triggers:
+        install_triggers(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("news_articles") as batch_op:
+        batch_op.drop_column("created_at")
+    _restore_desc_index()
@@ -0,0 +1,44 @@
+"""news_dates rollup maintained by triggers
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.news_dates import drop_triggers, install_triggers, rebuild, triggers_installed
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "news_dates",
+        sa.Column("ticker", sa.String(), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("article_count", sa.Integer(), nullable=False),
+        sa.Column("analyzed_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    bind = op.get_bind()
+    # create_all may have installed them on an unversioned database
+    if op.get_context().as_sql or not triggers_installed(bind):
+        install_triggers(bind)
+    rebuild(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_triggers(op.get_bind())
+    op.drop_table("news_dates")
@@ -0,0 +1,75 @@
+"""numeric LLM scores and summary length as generated columns
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models import parse_score
+from app.news_dates import drop_triggers, install_triggers
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCORE_COLUMNS = ("valence", "arousal", "importance")
+
+
+def _has_column(table: str, column: str) -> bool:
+    # Unversioned create_all databases may already have it; offline SQL assumes not
+    if op.get_context().as_sql:
+        return False
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _recreate() -> str:
+    # SQLite cannot ADD a STORED generated column, so recreate the table there
+    return "always" if op.get_bind().dialect.name == "sqlite" else "auto"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _has_column("llm_news", "summary_length"):
+        return
+    # news_dates triggers reference llm_news, which SQLite rejects while the
+    # table is being recreated
+    drop_triggers(op.get_bind())
+    # Adding STORED generated columns computes them for every existing row,
+    # which is the backfill from the string columns
+    with op.batch_alter_table("llm_news", recreate=_recreate()) as batch_op:
+        for name in SCORE_COLUMNS:
+            batch_op.add_column(
+                sa.Column(
+                    f"{name}_score",
+                    sa.Float(),
+                    sa.Computed(parse_score(sa.literal_column(name)), persisted=True),
+                )
+            )
+        batch_op.add_column(
+            sa.Column(
+                "summary_length",
+                sa.Integer(),
+                sa.Computed(
+                    sa.func.char_length(sa.literal_column("summary")), persisted=True
+                ),
+            )
+        )
+    install_triggers(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_triggers(op.get_bind())
+    with op.batch_alter_table("llm_news", recreate=_recreate()) as batch_op:
+        batch_op.drop_column("summary_length")
+        for name in reversed(SCORE_COLUMNS):
+            batch_op.drop_column(f"{name}_score")
+    install_triggers(op.get_bind())
@@ -0,0 +1,34 @@
+"""drop job_run_items (superseded by the email outbox)
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_table("job_run_items", if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_table(
+        "job_run_items",
+        sa.Column("job_name", sa.String(), primary_key=True),
+        sa.Column("run_key", sa.String(), primary_key=True),
+        sa.Column("item_key", sa.String(), primary_key=True),
+        if_not_exists=True,
+    )
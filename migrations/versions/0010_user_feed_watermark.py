@@ -0,0 +1,39 @@
+"""user_feeds.watermark (committed news_dates changes reflected in the feed)
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    # Unversioned create_all databases may already have it; offline SQL assumes not
+    if op.get_context().as_sql:
+        return False
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _has_column("user_feeds", "watermark"):
+        return
+    # NULL marks a feed for rebuild, so existing feeds are recomputed once
+    op.add_column("user_feeds", sa.Column("watermark", sa.DateTime(timezone=True)))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("user_feeds") as batch_op:
+        batch_op.drop_column("watermark")
@@ -0,0 +1,39 @@
+"""indexes for the incremental feed refresh
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, Sequence[str], None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INTEREST_TABLES = ("user_index_interest", "user_stock_interest")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_news_dates_updated_at", "news_dates", ["updated_at"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_user_feeds_watermark", "user_feeds", ["watermark"], if_not_exists=True
+    )
+    for table in INTEREST_TABLES:
+        op.create_index(f"ix_{table}_ticker", table, ["ticker"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in INTEREST_TABLES:
+        op.drop_index(f"ix_{table}_ticker", table_name=table)
+    op.drop_index("ix_user_feeds_watermark", table_name="user_feeds")
+    op.drop_index("ix_news_dates_updated_at", table_name="news_dates")